@@ -1,72 +1,321 @@
 import asyncio
+import hashlib
+import re
 import time
-from typing import List, Dict, Any, Callable, Awaitable, Optional
+from functools import partial
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Tuple
 from dataclasses import dataclass
 from llm.client import LLMClient, ToolDefinition, LLMResponse
 from browser_core.chrome_driver import ChromeDriver
+from browser_tools import set_browser_instance
+from browser_tools.navigation import go_to_url, go_back, go_forward
+from browser_tools.extraction import get_page_content, extract_text_by_selector
+from browser_tools.interaction import click_element, type_text, scroll_page, scroll_sequence
+from browser_tools.screenshot import take_screenshot
+from browser_tools.human_handoff import request_human_intervention
+from utils.json_utils import dumps
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 工具结果写入上下文的最大长度
+MAX_TOOL_RESULT_LENGTH = 2000
+# 页面文本首次写入上下文时保留的摘录长度，完整文本保存在artifacts中
+PAGE_TEXT_EXCERPT_LENGTH = 1000
+# 页面文本引用中的内容哈希编号
+_ARTIFACT_REF_RE = re.compile(r"\b[0-9a-f]{8}\b")
+
+# 已包含结论的回答可直接作为最终结果，无需再请求一次LLM整理
+FINAL_ANSWER_MIN_LENGTH = 50
+_FINAL_ANSWER_MARKERS = re.compile(r"综上|总结|答案是|Final answer|In conclusion", re.IGNORECASE)
+
+def _looks_final(content: Optional[str]) -> bool:
+    """判断LLM的回答是否已经是完整的最终结果"""
+    return bool(content) and len(content) > FINAL_ANSWER_MIN_LENGTH and _FINAL_ANSWER_MARKERS.search(content) is not None
+
+# 可用工具定义：(工具名称, 工具函数, 描述, 参数说明)
+_TOOL_SPECS: Tuple[Tuple[str, Callable[..., Awaitable[Any]], str, Dict[str, str]], ...] = (
+    # 导航工具
+    (
+        "go_to_url",
+        go_to_url,
+        "导航到指定的URL",
+        {"url": "字符串，要导航到的URL地址"}
+    ),
+    (
+        "back",
+        go_back,
+        "导航到浏览器历史记录中的上一页",
+        {}
+    ),
+    (
+        "forward",
+        go_forward,
+        "导航到浏览器历史记录中的下一页",
+        {}
+    ),
+    # 提取工具
+    (
+        "get_page_content",
+        get_page_content,
+        "获取当前页面的内容",
+        {"selector": "可选字符串，CSS选择器，用于指定要获取内容的元素，不指定则获取整个页面"}
+    ),
+    (
+        "extract_text_by_selector",
+        extract_text_by_selector,
+        "通过CSS选择器提取页面中特定元素的文本",
+        {"selector": "字符串，CSS选择器，用于指定要提取文本的元素"}
+    ),
+    # 交互工具
+    (
+        "click",
+        click_element,
+        "点击页面中的元素",
+        {"selector": "字符串，CSS选择器，用于指定要点击的元素"}
+    ),
+    (
+        "type_text",
+        type_text,
+        "在页面元素中输入文本",
+        {
+            "selector": "字符串，CSS选择器，用于指定要输入文本的元素",
+            "text": "字符串，要输入的文本内容"
+        }
+    ),
+    (
+        "scroll_down",
+        partial(scroll_page, direction="down", pixels=500),
+        "向下滚动页面",
+        {"pixels": "可选整数，要滚动的像素数，默认为500"}
+    ),
+    (
+        "scroll_up",
+        partial(scroll_page, direction="up", pixels=500),
+        "向上滚动页面",
+        {"pixels": "可选整数，要滚动的像素数，默认为500"}
+    ),
+    (
+        "scroll_sequence",
+        scroll_sequence,
+        "在一次操作中依次执行多次滚动，适合需要连续滚动加载更多内容的页面",
+        {"pixels_list": "整数列表，每次滚动的像素数，正数向下、负数向上，例如 [500, 500, 500]"}
+    ),
+    # 截图工具
+    (
+        "take_screenshot",
+        take_screenshot,
+        "对当前页面进行截图",
+        {"description": "可选字符串，对截图的描述"}
+    ),
+    # 人工接管工具
+    (
+        "request_human_intervention",
+        request_human_intervention,
+        "请求人工介入处理，当遇到无法自动处理的情况（如登录、验证码）时使用",
+        {"reason": "字符串，说明需要人工介入的原因和需要完成的操作"}
+    ),
+)
+
+class ContextBuffer:
+    """
+    对话上下文缓冲区，控制每次发送给LLM的上下文规模
+    
+    - 跳过与上一条观察完全相同的观察消息（页面未变化时很常见）
+    - 只保留最近若干条观察消息，更早的观察已被后续状态取代
+    - 较早的消息可被合并为摘要，迭代时摘要作为第一条消息输出
+    """
+    
+    OBSERVATION_PREFIX = "观察: "
+    
+    def __init__(self, max_messages: int = 20, max_observations: int = 3):
+        self.max_messages = max_messages
+        self.max_observations = max_observations
+        self.messages: List[Dict[str, str]] = []
+        self.summary: Optional[str] = None
+        self._last_observation_hash: Optional[int] = None
+    
+    def _is_observation(self, message: Dict[str, str]) -> bool:
+        return message["role"] == "system" and message["content"].startswith(self.OBSERVATION_PREFIX)
+    
+    def append(self, message: Dict[str, str]):
+        """添加一条消息，重复的观察会被跳过，超出数量的旧观察会被移除"""
+        if self._is_observation(message):
+            digest = hash(message["content"])
+            if digest == self._last_observation_hash:
+                return
+            self._last_observation_hash = digest
+            
+            self.messages.append(message)
+            observations = [index for index, item in enumerate(self.messages) if self._is_observation(item)]
+            for index in reversed(observations[:-self.max_observations]):
+                del self.messages[index]
+        else:
+            self.messages.append(message)
+    
+    def overflow(self) -> List[Dict[str, str]]:
+        """返回超出保留数量、需要合并到摘要中的消息（包含已有摘要）"""
+        older = self.messages[:-self.max_messages]
+        if older and self.summary:
+            older = [self._summary_message()] + older
+        return older
+    
+    def compact(self, summary: str, summarized: List[Dict[str, str]]):
+        """
+        用新的摘要替换已被压缩的消息
+        
+        摘要在后台生成，期间可能有新消息加入，因此按对象身份移除summarized中的消息，
+        而不是按位置截断
+        """
+        summarized_ids = {id(message) for message in summarized}
+        self.messages = [message for message in self.messages if id(message) not in summarized_ids]
+        self.summary = summary
+    
+    def _summary_message(self) -> Dict[str, str]:
+        return {"role": "system", "content": f"历史摘要: {self.summary}"}
+    
+    def __iter__(self):
+        if self.summary:
+            yield self._summary_message()
+        yield from self.messages
+    
+    def __len__(self) -> int:
+        return len(self.messages) + (1 if self.summary else 0)
+
 @dataclass
 class AgentState:
     """Agent的状态信息"""
     task: str
-    context: List[Dict[str, str]] = None
+    context: ContextBuffer = None
     current_url: str = ""
     is_human_in_control: bool = False
     last_action: Optional[str] = None
     last_result: Optional[str] = None
+    artifacts: Dict[str, str] = None
     
     def __post_init__(self):
         if self.context is None:
-            self.context = []
+            self.context = ContextBuffer()
+        if self.artifacts is None:
+            self.artifacts = {}
 
 class ToolExecutor:
     """工具执行器，负责调用实际的工具函数"""
     
-    def __init__(self, browser: ChromeDriver):
+    def __init__(self, browser: ChromeDriver, artifacts: Optional[Dict[str, str]] = None):
         self.browser = browser
-        self.tools = {}
+        # 大段页面文本按内容哈希保存，上下文中只保留摘录和引用
+        self.artifacts = artifacts if artifacts is not None else {}
+        # 工具名称到函数的直接映射，以及只在注册时构建一次的工具定义列表
+        self._funcs: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._defs: List[ToolDefinition] = []
+        for name, func, description, parameters in _TOOL_SPECS:
+            self.register_tool(name, func, description, parameters)
+        self.register_tool(
+            "read_artifact",
+            self.read_artifact,
+            "读取之前保存的完整页面文本，用于查看页面内容摘录之外的部分",
+            {
+                "ref": "字符串，页面内容中的引用，如 [artifact:1a2b3c4d, 5000 chars] 或其中的8位编号",
+                "offset": "可选整数，起始字符位置，默认为0",
+                "length": f"可选整数，读取的字符数，默认为{PAGE_TEXT_EXCERPT_LENGTH}"
+            }
+        )
         
     def register_tool(self, name: str, func: Callable[..., Awaitable[Any]], description: str, parameters: Dict[str, str]):
         """注册工具函数"""
-        self.tools[name] = {
-            "func": func,
-            "description": description,
-            "parameters": parameters
-        }
+        if name in self._funcs:
+            self._defs = [tool for tool in self._defs if tool.name != name]
+        self._funcs[name] = func
+        self._defs.append(ToolDefinition(name=name, description=description, parameters=parameters))
     
     def get_tool_definitions(self) -> List[ToolDefinition]:
         """获取所有工具的定义，用于传递给LLM"""
-        return [
-            ToolDefinition(
-                name=name,
-                description=tool["description"],
-                parameters=tool["parameters"]
-            ) for name, tool in self.tools.items()
-        ]
+        return self._defs
     
     async def execute(self, tool_name: str, parameters: Dict[str, Any]) -> str:
         """执行指定的工具"""
-        if tool_name not in self.tools:
+        tool_func = self._funcs.get(tool_name)
+        if tool_func is None:
             return f"错误：未知工具 '{tool_name}'"
         
         try:
             logger.info(f"执行工具: {tool_name}, 参数: {parameters}")
-            tool_func = self.tools[tool_name]["func"]
             result = await tool_func(**parameters)
+            reference = self._store_page_text(result) if tool_name == "get_page_content" else None
             
-            # 限制结果长度，避免上下文过长
-            if isinstance(result, str) and len(result) > 2000:
-                result = result[:2000] + "...\n[结果已截断]"
+            # 先序列化并截断，再写入日志和上下文，避免上下文过长
+            result_repr = result if isinstance(result, str) else dumps(result)
+            if len(result_repr) > MAX_TOOL_RESULT_LENGTH:
+                result_repr = result_repr[:MAX_TOOL_RESULT_LENGTH] + "...\n[结果已截断]"
+                # 元数据过长时引用也可能被截掉，此时在末尾补上，保证完整文本仍可通过read_artifact读取
+                if reference and reference not in result_repr:
+                    result_repr += f" 完整页面文本: {reference}"
                 
-            return f"工具 '{tool_name}' 执行成功: {result}"
+            return f"工具 '{tool_name}' 执行成功: {result_repr}"
         except Exception as e:
             error_msg = f"工具 '{tool_name}' 执行失败: {str(e)}"
             logger.error(error_msg)
             return error_msg
 
+    def _store_page_text(self, result: Any) -> Optional[str]:
+        """
+        将页面预览文本保存到artifacts，结果中替换为引用和摘录，返回引用
+        
+        引用放在摘录之前；摘录长度按结果中其余字段（如元数据）占用后剩余的空间计算，
+        使序列化后的结果尽量不超过MAX_TOOL_RESULT_LENGTH
+        """
+        content = result.get("content") if isinstance(result, dict) else None
+        if not isinstance(content, dict) or not content.get("text_preview"):
+            return None
+        
+        text = content["text_preview"]
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:8]
+        reference = f"[artifact:{digest}, {len(text)} chars]"
+        if digest in self.artifacts:
+            # 早先的摘录可能已被上下文压缩移除，重复时仍保留摘录
+            prefix = f"{reference} 与之前获取的页面文本相同: "
+        else:
+            self.artifacts[digest] = text
+            prefix = f"{reference} "
+        
+        content["text_preview"] = prefix + "..."
+        budget = min(PAGE_TEXT_EXCERPT_LENGTH, MAX_TOOL_RESULT_LENGTH - len(dumps(result)))
+        excerpt = text[:max(0, budget)]
+        # 换行、引号等字符序列化后会变长，按转义多出的长度再缩短一次
+        escaped_extra = len(dumps(excerpt)) - len(excerpt) - 2
+        if escaped_extra > 0:
+            excerpt = excerpt[:max(0, len(excerpt) - escaped_extra)]
+        ellipsis = "..." if len(excerpt) < len(text) else ""
+        content["text_preview"] = f"{prefix}{excerpt}{ellipsis}"
+        return reference
+    
+    async def read_artifact(self, ref: str, offset: int = 0, length: int = PAGE_TEXT_EXCERPT_LENGTH) -> dict:
+        """
+        按引用读取保存的页面文本片段
+        
+        参数:
+            ref: 页面文本引用，可以是完整的 [artifact:xxxxxxxx, N chars] 或8位编号
+            offset: 起始字符位置
+            length: 读取的字符数
+            
+        返回:
+            包含操作结果的字典，包括是否成功、文本片段、文本总长度和消息
+        """
+        match = _ARTIFACT_REF_RE.search(ref)
+        text = self.artifacts.get(match.group(0)) if match else None
+        if text is None:
+            return {"success": False, "text": None, "message": f"未找到引用 {ref} 对应的页面文本"}
+        
+        offset = max(0, int(offset))
+        end = offset + max(0, int(length))
+        return {
+            "success": True,
+            "text": text[offset:end],
+            "total_length": len(text),
+            "message": f"已读取第 {offset} 至 {min(end, len(text))} 个字符，共 {len(text)} 个字符"
+        }
+
 class MainAgent:
     """LLM驱动的中央代理，负责协调工具调用和任务执行"""
     
@@ -74,109 +323,23 @@ class MainAgent:
         self.state = AgentState(task=task)
         self.llm_client = LLMClient()
         self.browser = ChromeDriver()
-        self.tool_executor = ToolExecutor(self.browser)
+        self.tool_executor = ToolExecutor(self.browser, self.state.artifacts)
         self.max_iterations = 50  # 最大迭代次数，防止无限循环
+        self.context_compact_interval = 5  # 每隔若干轮迭代将较早的上下文合并为摘要
+        # 上下文压缩在后台进行，与LLM调用和工具执行重叠
+        self._compact_task: Optional[asyncio.Task] = None
     
     async def initialize(self):
         """初始化代理"""
         # 启动浏览器
         await self.browser.start()
-        # 注册工具（实际使用时会从browser_tools导入并注册）
-        await self._register_tools()
         # 向LLM注册工具定义
         self.llm_client.register_tools(self.tool_executor.get_tool_definitions())
     
-    async def _register_tools(self):
-        """注册所有可用工具"""
-        # 这里只是示例，实际实现时会从browser_tools包中导入真实工具
-        # 导航工具
-        from browser_tools.navigation import go_to_url, back, forward
-        self.tool_executor.register_tool(
-            "go_to_url",
-            go_to_url,
-            "导航到指定的URL",
-            {"url": "字符串，要导航到的URL地址"}
-        )
-        self.tool_executor.register_tool(
-            "back",
-            back,
-            "导航到浏览器历史记录中的上一页",
-            {}
-        )
-        self.tool_executor.register_tool(
-            "forward",
-            forward,
-            "导航到浏览器历史记录中的下一页",
-            {}
-        )
-        
-        # 提取工具
-        from browser_tools.extraction import get_page_content, extract_text_by_selector
-        self.tool_executor.register_tool(
-            "get_page_content",
-            get_page_content,
-            "获取当前页面的内容",
-            {"selector": "可选字符串，CSS选择器，用于指定要获取内容的元素，不指定则获取整个页面"}
-        )
-        self.tool_executor.register_tool(
-            "extract_text_by_selector",
-            extract_text_by_selector,
-            "通过CSS选择器提取页面中特定元素的文本",
-            {"selector": "字符串，CSS选择器，用于指定要提取文本的元素"}
-        )
-        
-        # 交互工具
-        from browser_tools.interaction import click, type_text, scroll_down, scroll_up
-        self.tool_executor.register_tool(
-            "click",
-            click,
-            "点击页面中的元素",
-            {"selector": "字符串，CSS选择器，用于指定要点击的元素"}
-        )
-        self.tool_executor.register_tool(
-            "type_text",
-            type_text,
-            "在页面元素中输入文本",
-            {
-                "selector": "字符串，CSS选择器，用于指定要输入文本的元素",
-                "text": "字符串，要输入的文本内容"
-            }
-        )
-        self.tool_executor.register_tool(
-            "scroll_down",
-            scroll_down,
-            "向下滚动页面",
-            {"pixels": "可选整数，要滚动的像素数，默认为500"}
-        )
-        self.tool_executor.register_tool(
-            "scroll_up",
-            scroll_up,
-            "向上滚动页面",
-            {"pixels": "可选整数，要滚动的像素数，默认为500"}
-        )
-        
-        # 截图工具
-        from browser_tools.screenshot import take_screenshot
-        self.tool_executor.register_tool(
-            "take_screenshot",
-            take_screenshot,
-            "对当前页面进行截图",
-            {"description": "可选字符串，对截图的描述"}
-        )
-        
-        # 人工接管工具
-        from browser_tools.human_handoff import request_human_intervention
-        self.tool_executor.register_tool(
-            "request_human_intervention",
-            request_human_intervention,
-            "请求人工介入处理，当遇到无法自动处理的情况（如登录、验证码）时使用",
-            {"reason": "字符串，说明需要人工介入的原因和需要完成的操作"}
-        )
-    
     async def _get_current_observation(self) -> str:
         """获取当前浏览器状态作为观察结果"""
-        url = await self.browser.get_current_url()
-        title = await self.browser.get_title()
+        # 观察结果直接决定LLM对当前页面的判断，每次都从页面实时读取URL
+        url, title = await self.browser.get_url_and_title()
         
         # 更新状态中的当前URL
         self.state.current_url = url
@@ -190,9 +353,25 @@ class MainAgent:
         
         return summary
     
+    def _start_compaction(self):
+        """在后台启动上下文压缩，上一次压缩尚未完成时跳过"""
+        if self._compact_task is not None and not self._compact_task.done():
+            return
+        older = self.state.context.overflow()
+        if older:
+            self._compact_task = asyncio.create_task(self._compact_context(older))
+    
+    async def _compact_context(self, older: List[Dict[str, str]]):
+        """将超出保留数量的较早消息交给LLM压缩为摘要"""
+        summary = await self.llm_client.summarize_context(older)
+        self.state.context.compact(summary, older)
+        logger.info(f"已将 {len(older)} 条较早的上下文消息压缩为摘要")
+    
     async def run(self) -> str:
         """运行代理，执行任务直到完成或达到最大迭代次数"""
         logger.info(f"开始执行任务: {self.state.task}")
+        # 工具函数在当前异步上下文中查找浏览器实例，多个代理并行运行时互不干扰
+        set_browser_instance(self.browser)
         
         for iteration in range(self.max_iterations):
             logger.info(f"迭代 {iteration + 1}/{self.max_iterations}")
@@ -203,6 +382,8 @@ class MainAgent:
             
             # 将观察结果添加到上下文
             self.state.context.append({"role": "system", "content": f"观察: {observation}"})
+            if (iteration + 1) % self.context_compact_interval == 0:
+                self._start_compaction()
             
             # 调用LLM获取下一步行动
             llm_response = await self.llm_client.generate_response(
@@ -218,6 +399,8 @@ class MainAgent:
             # 检查任务是否完成
             if llm_response.is_finished:
                 logger.info("任务已完成")
+                if _looks_final(llm_response.content):
+                    return llm_response.content
                 # 请求最终结果整理
                 final_response = await self.llm_client.generate_response(
                     user_task=self.state.task,
@@ -251,9 +434,6 @@ class MainAgent:
                     "role": "user", 
                     "content": "请提供具体的工具调用指令来继续完成任务。"
                 })
-            
-            # 短暂延迟，避免操作过快
-            await asyncio.sleep(1)
         
         # 如果达到最大迭代次数仍未完成
         logger.warning(f"已达到最大迭代次数 ({self.max_iterations})，任务可能未完成")
@@ -267,6 +447,12 @@ class MainAgent:
     
     async def shutdown(self):
         """关闭代理，清理资源"""
+        if self._compact_task is not None and not self._compact_task.done():
+            self._compact_task.cancel()
+            try:
+                await self._compact_task
+            except asyncio.CancelledError:
+                pass
         await self.browser.stop()
         await self.llm_client.close()
         logger.info("代理已关闭")
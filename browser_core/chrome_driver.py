@@ -6,41 +6,194 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
-import time
+import asyncio
+import base64
+import concurrent.futures
+import functools
 import logging
-from config.settings import Settings
+import os
+import re
+import shutil
+import subprocess
+import time
+from config.settings import config
+from utils.json_utils import dumps, loads
+
+# ChromeDriver路径缓存文件及有效期，避免每次启动都联网检查驱动版本
+_DRIVER_PATH_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "webagent", "chromedriver_path")
+_DRIVER_PATH_CACHE_TTL = 7 * 24 * 3600
+# 点击已触发跳转后等待新文档创建的时间上限；跳转不产生新文档（如下载、204响应）时最多等待这么久
+_NAVIGATION_START_TIMEOUT = 5
+# 在页面上安装一次性的跳转监听：beforeunload/pagehide触发时置位标记，点击后据此判断是否有跳转开始，
+# 未开始跳转的点击（下拉菜单、标签页、单页应用路由）无需等待新文档
+_WATCH_NAVIGATION_JS = """
+window.__webagentNavigating = false;
+if (!window.__webagentNavigationWatched) {
+    window.__webagentNavigationWatched = true;
+    const mark = () => { window.__webagentNavigating = true; };
+    window.addEventListener('beforeunload', mark);
+    window.addEventListener('pagehide', mark);
+}
+"""
+# 点击后读取文档时间原点和跳转标记；新文档中标记不存在，由时间原点的变化判断
+_NAVIGATION_STATE_JS = "return [performance.timeOrigin, window.__webagentNavigating === true];"
+# 通过CDP点击元素的脚本，返回[点击前的文档时间原点, 是否已开始跳转]；
+# 元素不存在、被禁用或不可见时返回null，交由Selenium等待元素可点击后再点击
+_CLICK_JS = """
+const el = document.querySelector(arguments[0]);
+if (!el || el.disabled || !el.getClientRects().length) return null;
+""" + _WATCH_NAVIGATION_JS + """
+const origin = performance.timeOrigin;
+el.click();
+return [origin, window.__webagentNavigating];
+"""
+
+# 通过CDP输入文本的脚本，只处理可编辑且可见的input/textarea：经原生value setter赋值，
+# React/Vue等受控组件才能感知到变化；元素不可输入或框架重置了值时返回false，交由send_keys输入
+_TYPE_JS = """
+const el = document.querySelector(arguments[0]);
+if (!(el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement)) return false;
+if (el.disabled || el.readOnly || !el.getClientRects().length) return false;
+const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+el.focus();
+Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return el.value === arguments[1];
+"""
+
+_CHROME_BINARIES = (
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+)
+
+def _chrome_major_version():
+    """获取本机Chrome的主版本号，无法获取时返回None"""
+    for binary in _CHROME_BINARIES:
+        path = shutil.which(binary) or (binary if os.path.isfile(binary) else None)
+        if not path:
+            continue
+        try:
+            output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"(\d+)\.", output)
+        if match:
+            return match.group(1)
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _resolved_driver_path():
+    """
+    获取ChromeDriver可执行文件路径
+    
+    本地缓存未过期、Chrome主版本未变化且文件仍存在时直接使用缓存，
+    否则通过ChromeDriverManager重新解析并更新缓存
+    """
+    logger = logging.getLogger(__name__)
+    chrome_version = _chrome_major_version()
+    try:
+        with open(_DRIVER_PATH_CACHE_FILE, "rb") as f:
+            cached = loads(f.read())
+        if (
+            time.time() - cached["timestamp"] < _DRIVER_PATH_CACHE_TTL
+            and cached.get("chrome_version") == chrome_version
+            and os.path.exists(cached["path"])
+        ):
+            return cached["path"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    path = ChromeDriverManager().install()
+    try:
+        os.makedirs(os.path.dirname(_DRIVER_PATH_CACHE_FILE), exist_ok=True)
+        with open(_DRIVER_PATH_CACHE_FILE, "w", encoding="utf-8") as f:
+            f.write(dumps({"path": path, "timestamp": time.time(), "chrome_version": chrome_version}))
+    except OSError as e:
+        logger.warning(f"写入ChromeDriver路径缓存失败: {str(e)}")
+    return path
 
 class ChromeDriver:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.settings = Settings()
-        self.driver = self._initialize_driver()
-        self.wait = WebDriverWait(self.driver, self.settings.WEBDRIVER_WAIT_TIMEOUT)
+        self.settings = config.browser
+        # 驱动在start()中启动，避免在事件循环中同步阻塞
+        self.driver = None
+        self.wait = None
+        # Selenium驱动不是线程安全的，所有驱动调用都在同一个专用线程中串行执行；
+        # 线程池在首次使用时创建，quit()后置空，以便同一实例可以再次start()
+        self._pool = None
+        # CDP文档根节点ID，每次导航后重新获取
+        self._root_node_id = None
+        # 当前URL缓存；可能改变URL的操作会将其标记为失效
+        self._url_cache = None
+        self._url_dirty = True
         
+    async def _run(self, fn, *args, **kwargs):
+        """在驱动专用线程中执行同步调用，避免阻塞事件循环"""
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="chromedriver")
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pool, functools.partial(fn, *args, **kwargs)
+        )
+    
+    async def start(self):
+        """启动浏览器，在驱动线程中初始化以免阻塞事件循环"""
+        if self.driver is not None:
+            return
+        self.driver = await self._run(self._initialize_driver)
+        self.wait = WebDriverWait(self.driver, self.settings.wait_timeout)
+    
+    async def stop(self):
+        """关闭浏览器并释放驱动"""
+        if self.driver is None:
+            return
+        await self.quit()
+        self.driver = None
+        self.wait = None
+    
     def _initialize_driver(self):
         """初始化Chrome浏览器驱动"""
         chrome_options = Options()
         
         # 配置选项
-        if self.settings.HEADLESS_MODE:
+        if self.settings.headless:
             chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--start-maximized")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument(f"user-agent={self.settings.USER_AGENT}")
+        if self.settings.user_agent:
+            chrome_options.add_argument(f"user-agent={self.settings.user_agent}")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+        
+        # 纯文本模式：工具只读取源码、文本和链接，关闭图片、通知和无关功能以加快页面加载
+        # 注意：此模式下截图中不会显示图片
+        if self.settings.text_only:
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2
+            })
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--disable-features=MediaRouter,Translate")
+            chrome_options.add_argument("--disable-gpu")
+            if not self.settings.extensions:
+                chrome_options.add_argument("--disable-extensions")
         
         # 添加扩展或其他配置
-        if self.settings.CHROME_EXTENSIONS:
-            for ext in self.settings.CHROME_EXTENSIONS:
+        if self.settings.extensions:
+            for ext in self.settings.extensions:
                 chrome_options.add_extension(ext)
         
         # 初始化驱动
         try:
-            if self.settings.CHROME_DRIVER_PATH:
-                service = Service(self.settings.CHROME_DRIVER_PATH)
+            if self.settings.driver_path:
+                service = Service(self.settings.driver_path)
             else:
                 # 自动管理驱动版本
-                service = Service(ChromeDriverManager().install())
+                service = Service(_resolved_driver_path())
                 
             driver = webdriver.Chrome(service=service, options=chrome_options)
             self.logger.info("Chrome驱动初始化成功")
@@ -49,47 +202,106 @@ class ChromeDriver:
             self.logger.error(f"Chrome驱动初始化失败: {str(e)}")
             raise
     
-    def navigate(self, url):
+    def _wait_ready(self, timeout=5, record_url=False):
+        """
+        等待页面文档加载完成（document.readyState为complete），超时仅记录警告
+        
+        就绪检查脚本同时返回location.href，record_url为True时顺带更新URL缓存，
+        省去导航后单独获取URL的一次往返
+        """
+        def probe(driver):
+            state, href = driver.execute_script("return [document.readyState, location.href]")
+            if record_url:
+                self._url_cache = href
+                self._url_dirty = False
+            return state == "complete"
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(probe)
+        except TimeoutException:
+            self.logger.warning(f"等待页面加载完成超时（{timeout}秒）")
+    
+    def _wait_after_click(self, time_origin, navigating):
+        """
+        等待点击触发的跳转完成，点击未触发跳转时直接返回
+        
+        跳转开始前旧文档的readyState已是complete，直接检查就绪会立即返回并读到旧页面；
+        因此先等待performance.timeOrigin变化（即新文档已创建），再等待页面就绪
+        """
+        if not navigating:
+            return
+        try:
+            WebDriverWait(self.driver, _NAVIGATION_START_TIMEOUT, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script("return performance.timeOrigin") != time_origin
+            )
+        except TimeoutException:
+            self.logger.warning(f"点击后跳转超时未产生新文档（{_NAVIGATION_START_TIMEOUT}秒）")
+        self._wait_ready()
+    
+    async def navigate(self, url):
+        """导航到指定URL"""
+        return await self._run(self._sync_navigate, url)
+    
+    def _sync_navigate(self, url):
         """导航到指定URL"""
+        self.mark_page_changed()
         try:
             self.driver.get(url)
             self.logger.info(f"导航到URL: {url}")
             # 等待页面加载完成
-            time.sleep(self.settings.PAGE_LOAD_DELAY)
+            self._wait_ready(self.settings.wait_timeout, record_url=True)
             return True
         except Exception as e:
             self.logger.error(f"导航到{url}失败: {str(e)}")
             return False
     
-    def go_back(self):
+    async def go_back(self):
+        """后退到上一页"""
+        return await self._run(self._sync_go_back)
+    
+    def _sync_go_back(self):
         """后退到上一页"""
+        self.mark_page_changed()
         try:
             self.driver.back()
             self.logger.info("后退到上一页")
-            time.sleep(self.settings.PAGE_LOAD_DELAY)
+            self._wait_ready(self.settings.wait_timeout, record_url=True)
             return True
         except Exception as e:
             self.logger.error(f"后退操作失败: {str(e)}")
             return False
     
-    def go_forward(self):
+    async def go_forward(self):
         """前进到下一页"""
+        return await self._run(self._sync_go_forward)
+    
+    def _sync_go_forward(self):
+        """前进到下一页"""
+        self.mark_page_changed()
         try:
             self.driver.forward()
             self.logger.info("前进到下一页")
-            time.sleep(self.settings.PAGE_LOAD_DELAY)
+            self._wait_ready(self.settings.wait_timeout, record_url=True)
             return True
         except Exception as e:
             self.logger.error(f"前进操作失败: {str(e)}")
             return False
     
-    def click_element(self, selector, by=By.CSS_SELECTOR):
+    async def click_element(self, selector, by=By.CSS_SELECTOR):
+        """点击指定元素"""
+        return await self._run(self._sync_click_element, selector, by)
+    
+    def _sync_click_element(self, selector, by=By.CSS_SELECTOR):
         """点击指定元素"""
+        # 点击和输入可能在页面就绪检查之后才触发跳转，因此不信任检查时的URL
+        self._url_dirty = True
         try:
             element = self.wait.until(EC.element_to_be_clickable((by, selector)))
+            time_origin = self.driver.execute_script(_WATCH_NAVIGATION_JS + "return performance.timeOrigin;")
             element.click()
             self.logger.info(f"点击元素: {selector}")
-            time.sleep(self.settings.ACTION_DELAY)
+            current_origin, navigating = self.driver.execute_script(_NAVIGATION_STATE_JS)
+            self._wait_after_click(time_origin, navigating or current_origin != time_origin)
             return True
         except TimeoutException:
             self.logger.warning(f"元素{selector}超时未可点击")
@@ -101,14 +313,34 @@ class ChromeDriver:
             self.logger.error(f"点击元素{selector}失败: {str(e)}")
             return False
     
-    def type_text(self, selector, text, by=By.CSS_SELECTOR):
+    async def click_element_fast(self, selector):
+        """通过一次CDP调用点击CSS选择器匹配的元素，元素不存在时返回False"""
+        return await self._run(self._sync_click_element_fast, selector)
+    
+    def _sync_click_element_fast(self, selector):
+        """通过一次CDP调用点击CSS选择器匹配的元素，元素不存在时返回False"""
+        state = self._sync_execute_and_probe(_CLICK_JS, (selector,))
+        if state is None:
+            return False
+        time_origin, navigating = state
+        self.logger.info(f"点击元素: {selector}")
+        self._wait_after_click(time_origin, navigating)
+        return True
+    
+    async def type_text(self, selector, text, by=By.CSS_SELECTOR):
+        """在指定元素中输入文本"""
+        return await self._run(self._sync_type_text, selector, text, by)
+    
+    def _sync_type_text(self, selector, text, by=By.CSS_SELECTOR):
         """在指定元素中输入文本"""
+        # 点击和输入可能在页面就绪检查之后才触发跳转，因此不信任检查时的URL
+        self._url_dirty = True
         try:
             element = self.wait.until(EC.presence_of_element_located((by, selector)))
             element.clear()
             element.send_keys(text)
             self.logger.info(f"在元素{selector}中输入文本: {text}")
-            time.sleep(self.settings.ACTION_DELAY)
+            self._wait_ready()
             return True
         except TimeoutException:
             self.logger.warning(f"元素{selector}超时未出现")
@@ -120,7 +352,23 @@ class ChromeDriver:
             self.logger.error(f"在元素{selector}中输入文本失败: {str(e)}")
             return False
     
-    def scroll(self, direction="down", pixels=None):
+    async def type_text_fast(self, selector, text):
+        """通过一次CDP调用在CSS选择器匹配的input/textarea中输入文本，无法可靠输入时返回False"""
+        return await self._run(self._sync_type_text_fast, selector, text)
+    
+    def _sync_type_text_fast(self, selector, text):
+        """通过一次CDP调用在CSS选择器匹配的input/textarea中输入文本，无法可靠输入时返回False"""
+        if not self._sync_execute_and_probe(_TYPE_JS, (selector, text)):
+            return False
+        self.logger.info(f"在元素{selector}中输入文本: {text}")
+        self._wait_ready()
+        return True
+    
+    async def scroll(self, direction="down", pixels=None):
+        """滚动页面"""
+        return await self._run(self._sync_scroll, direction, pixels)
+    
+    def _sync_scroll(self, direction="down", pixels=None):
         """滚动页面"""
         try:
             if direction == "down":
@@ -136,42 +384,234 @@ class ChromeDriver:
                     self.driver.execute_script("window.scrollTo(0, 0);")
                 self.logger.info(f"向上滚动页面{pixels or '到顶部'}像素")
             
-            time.sleep(self.settings.ACTION_DELAY)
+            self._wait_ready()
             return True
         except Exception as e:
             self.logger.error(f"页面滚动失败: {str(e)}")
             return False
     
-    def get_page_source(self):
-        """获取当前页面的HTML源码"""
+    async def scroll_batch(self, pixels_list, interval_ms=200):
+        """在一次脚本调用中依次执行多次滚动，正数向下、负数向上"""
+        return await self._run(self._sync_scroll_batch, pixels_list, interval_ms)
+    
+    def _sync_scroll_batch(self, pixels_list, interval_ms=200):
+        """在一次脚本调用中依次执行多次滚动，正数向下、负数向上"""
+        try:
+            # 每次滚动之间留出间隔，让懒加载内容有机会加载
+            self.driver.execute_async_script(
+                """
+                const [steps, interval, done] = arguments;
+                let index = 0;
+                (function next() {
+                    if (index >= steps.length) {
+                        done();
+                        return;
+                    }
+                    window.scrollBy(0, steps[index++]);
+                    setTimeout(next, interval);
+                })();
+                """,
+                list(pixels_list),
+                interval_ms
+            )
+            self.logger.info(f"依次滚动页面: {pixels_list}")
+            self._wait_ready()
+            return True
+        except Exception as e:
+            self.logger.error(f"批量滚动页面失败: {str(e)}")
+            return False
+    
+    async def execute_and_probe(self, js, args=()):
+        """
+        通过CDP的Runtime.evaluate在一次调用中执行页面操作并返回结果
+        
+        参数:
+            js: 函数体脚本，通过arguments访问参数，以return返回所需的值
+            args: 传给脚本的参数，需可JSON序列化
+        
+        返回:
+            脚本的返回值，调用失败或脚本抛出异常时返回None
+        """
+        return await self._run(self._sync_execute_and_probe, js, args)
+    
+    def _sync_execute_and_probe(self, js, args=()):
+        """通过CDP的Runtime.evaluate在一次调用中执行页面操作并返回结果"""
+        # 脚本可能触发跳转，URL缓存随之失效
+        self._url_dirty = True
+        expression = f"(function() {{ {js} }}).apply(null, {dumps(list(args))})"
+        try:
+            return self._evaluate(expression)
+        except Exception as e:
+            self.logger.warning(f"通过CDP执行脚本失败: {str(e)}")
+            return None
+    
+    def _evaluate(self, expression):
+        """通过CDP的Runtime.evaluate执行表达式并按值返回结果，脚本抛出异常时抛出RuntimeError"""
+        result = self.driver.execute_cdp_cmd(
+            "Runtime.evaluate", {"expression": expression, "returnByValue": True}
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise RuntimeError(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value")
+    
+    def _get_root_node_id(self, refresh=False):
+        """获取CDP文档根节点ID，必要时重新获取"""
+        if refresh or self._root_node_id is None:
+            document = self.driver.execute_cdp_cmd("DOM.getDocument", {"depth": 0})
+            self._root_node_id = document["root"]["nodeId"]
+        return self._root_node_id
+    
+    def _execute_on_root(self, command):
+        """以文档根节点ID执行CDP命令，根节点失效（如页面被手动跳转）时刷新后重试一次"""
+        try:
+            return command(self._get_root_node_id())
+        except Exception:
+            return command(self._get_root_node_id(refresh=True))
+    
+    async def get_page_source_cdp(self):
+        """通过CDP的DOM.getOuterHTML获取当前页面的HTML源码"""
+        return await self._run(self._sync_get_page_source_cdp)
+    
+    def _sync_get_page_source_cdp(self):
+        """通过CDP的DOM.getOuterHTML获取当前页面的HTML源码"""
+        try:
+            result = self._execute_on_root(
+                lambda node_id: self.driver.execute_cdp_cmd("DOM.getOuterHTML", {"nodeId": node_id})
+            )
+            return result["outerHTML"]
+        except Exception as e:
+            self.logger.warning(f"通过CDP获取页面源码失败: {str(e)}")
+            return None
+    
+    async def query_outer_html(self, selector):
+        """
+        通过CDP在浏览器端执行CSS选择器，只返回匹配节点的HTML片段
+        
+        返回:
+            匹配节点的outerHTML列表，CDP调用失败时返回None
+        """
+        return await self._run(self._sync_query_outer_html, selector)
+    
+    def _sync_query_outer_html(self, selector):
+        """通过CDP在浏览器端执行CSS选择器，只返回匹配节点的HTML片段"""
+        # 一次Runtime.evaluate取回全部片段，避免每个匹配节点各一次DOM.getOuterHTML往返
+        expression = f"Array.from(document.querySelectorAll({dumps(selector)}), e => e.outerHTML)"
+        try:
+            return self._evaluate(expression)
+        except Exception as e:
+            self.logger.warning(f"通过CDP查询选择器{selector}失败: {str(e)}")
+            return None
+    
+    async def get_page_source(self):
+        """获取当前页面的HTML源码，优先使用CDP，失败时退回WebDriver"""
+        return await self._run(self._sync_get_page_source)
+    
+    def _sync_get_page_source(self):
+        """获取当前页面的HTML源码，优先使用CDP，失败时退回WebDriver"""
+        page_source = self._sync_get_page_source_cdp()
+        if page_source is not None:
+            return page_source
+        
         try:
             return self.driver.page_source
         except Exception as e:
             self.logger.error(f"获取页面源码失败: {str(e)}")
             return None
     
-    def get_current_url(self):
+    async def get_title(self):
+        """获取当前页面标题"""
+        return await self._run(self._sync_get_title)
+    
+    def _sync_get_title(self):
+        """获取当前页面标题"""
+        try:
+            return self.driver.title
+        except Exception as e:
+            self.logger.error(f"获取页面标题失败: {str(e)}")
+            return None
+    
+    async def get_url_and_title(self):
+        """
+        在一次脚本调用中读取当前URL和页面标题
+        
+        总是从页面实时读取，不使用URL缓存（页面内脚本跳转和history.pushState不会使缓存失效），
+        读取结果顺带更新URL缓存
+        
+        返回:
+            (URL, 标题) 元组，读取失败时均为None
+        """
+        return await self._run(self._sync_get_url_and_title)
+    
+    def _sync_get_url_and_title(self):
+        """在一次脚本调用中读取当前URL和页面标题"""
+        try:
+            href, title = self.driver.execute_script("return [location.href, document.title]")
+            self._url_cache = href
+            self._url_dirty = False
+            return href, title
+        except Exception as e:
+            self.logger.error(f"获取当前URL和标题失败: {str(e)}")
+            return None, None
+    
+    @property
+    def last_known_url(self):
+        """最近一次读取到的URL，不发起驱动调用，可能已过期，只适合用于提示信息"""
+        return self._url_cache
+    
+    def mark_page_changed(self):
+        """标记页面可能已被外部改变（如人工操作），使CDP根节点和URL缓存失效"""
+        self._root_node_id = None
+        self._url_dirty = True
+    
+    async def get_current_url(self):
+        """获取当前页面URL，缓存有效时直接返回缓存"""
+        if not self._url_dirty and self._url_cache is not None:
+            return self._url_cache
+        return await self._run(self._sync_get_current_url)
+    
+    def _sync_get_current_url(self):
         """获取当前页面URL"""
         try:
-            return self.driver.current_url
+            self._url_cache = self.driver.current_url
+            self._url_dirty = False
+            return self._url_cache
         except Exception as e:
             self.logger.error(f"获取当前URL失败: {str(e)}")
             return None
     
-    def take_screenshot(self, file_path):
-        """截取当前页面并保存"""
+    async def capture_screenshot(self, fmt="png", quality=75):
+        """
+        截取当前页面，只返回图片字节，不写入磁盘
+        
+        参数:
+            fmt: 图片格式，png通过WebDriver截取，jpeg/webp通过CDP截取，体积远小于PNG
+            quality: 有损格式的压缩质量
+        
+        返回:
+            图片字节，截图失败时返回None
+        """
+        return await self._run(self._sync_capture_screenshot, fmt, quality)
+    
+    def _sync_capture_screenshot(self, fmt="png", quality=75):
+        """截取当前页面，只返回图片字节，不写入磁盘"""
         try:
-            result = self.driver.save_screenshot(file_path)
-            if result:
-                self.logger.info(f"截图已保存至: {file_path}")
-            else:
-                self.logger.warning("截图保存失败")
-            return result
+            if fmt == "png":
+                return self.driver.get_screenshot_as_png()
+            result = self.driver.execute_cdp_cmd(
+                "Page.captureScreenshot",
+                {"format": fmt, "quality": quality, "captureBeyondViewport": False}
+            )
+            return base64.b64decode(result["data"])
         except Exception as e:
             self.logger.error(f"截图失败: {str(e)}")
-            return False
+            return None
+    
+    async def find_elements(self, selector, by=By.CSS_SELECTOR):
+        """查找符合选择器的所有元素"""
+        return await self._run(self._sync_find_elements, selector, by)
     
-    def find_elements(self, selector, by=By.CSS_SELECTOR):
+    def _sync_find_elements(self, selector, by=By.CSS_SELECTOR):
         """查找符合选择器的所有元素"""
         try:
             elements = self.driver.find_elements(by, selector)
@@ -184,7 +624,15 @@ class ChromeDriver:
             self.logger.error(f"查找元素{selector}失败: {str(e)}")
             return []
     
-    def quit(self):
+    async def quit(self):
+        """关闭浏览器并停止驱动线程"""
+        try:
+            await self._run(self._sync_quit)
+        finally:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+    
+    def _sync_quit(self):
         """关闭浏览器"""
         try:
             self.driver.quit()
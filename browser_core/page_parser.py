@@ -1,34 +1,134 @@
 from bs4 import BeautifulSoup
+from soupsieve import compile as sv_compile
+import functools
 import logging
 from urllib.parse import urljoin, urlparse
 
+# 优先使用基于C扩展的lxml解析器，未安装时退回标准库html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# selectolax用于只需链接的快速路径，无需构建完整的BeautifulSoup树；
+# selectolax 1.0起已移除Modest后端（selectolax.parser），统一使用Lexbor后端
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# 已编译的CSS选择器缓存，同一选择器在多次提取中只编译一次
+_compile_selector = functools.lru_cache(maxsize=256)(sv_compile)
+
+# 以这些前缀开头的链接已是绝对地址，无需再调用urljoin解析
+_ABSOLUTE_URL_PREFIXES = ('http://', 'https://')
+
+def _normalize_link_text(text):
+    """合并链接文本中的连续空白；两种解析后端都先取原始文本再经此处理，保证结果一致"""
+    return " ".join(text.split())
+
+def _resolve_links(hrefs, texts, base_url=None):
+    """批量生成链接字典，只对相对路径调用urljoin"""
+    if base_url:
+        urls = [href if href.startswith(_ABSOLUTE_URL_PREFIXES) else urljoin(base_url, href) for href in hrefs]
+    else:
+        urls = hrefs
+    return [
+        {'text': text, 'url': url, 'original_href': href}
+        for text, url, href in zip(texts, urls, hrefs)
+    ]
+
 class PageParser:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # 最近一次解析的HTML及其解析结果，同一份源码的多次提取复用同一棵树
+        self._last_html = None
+        self._last_soup = None
+        self._last_fast_html = None
+        self._last_fast_tree = None
     
     def parse_html(self, html_content):
         """解析HTML内容并返回BeautifulSoup对象"""
+        # 内容相同的源码（即使是不同的字符串对象）直接复用上次的解析结果
+        if self._last_soup is not None and (html_content is self._last_html or html_content == self._last_html):
+            return self._last_soup
+        
         try:
-            return BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, HTML_PARSER)
+            self._last_html = html_content
+            self._last_soup = soup
+            return soup
         except Exception as e:
             self.logger.error(f"HTML解析失败: {str(e)}")
             return None
     
+    def _parse_fast(self, html_content):
+        """使用selectolax解析HTML，去除脚本和样式节点"""
+        if self._last_fast_tree is not None and (
+            html_content is self._last_fast_html or html_content == self._last_fast_html
+        ):
+            return self._last_fast_tree
+        
+        try:
+            tree = HTMLParser(html_content)
+            tree.strip_tags(['script', 'style'])
+            self._last_fast_html = html_content
+            self._last_fast_tree = tree
+            return tree
+        except Exception as e:
+            self.logger.error(f"HTML快速解析失败: {str(e)}")
+            return None
+    
+    def _extract_links_fast(self, html_content, base_url=None):
+        """基于selectolax的链接提取"""
+        tree = self._parse_fast(html_content)
+        if not tree:
+            return []
+        
+        try:
+            nodes = tree.css('a[href]')
+            hrefs = [node.attributes.get('href') or "" for node in nodes]
+            texts = [_normalize_link_text(node.text()) for node in nodes]
+            links = _resolve_links(hrefs, texts, base_url)
+            self.logger.info(f"提取到{len(links)}个链接")
+            return links
+        except Exception as e:
+            self.logger.error(f"链接提取失败: {str(e)}")
+            return []
+    
     def extract_text(self, html_content, selector=None):
         """从HTML中提取文本内容，可指定选择器"""
         soup = self.parse_html(html_content)
         if not soup:
             return ""
-            
+        return self._extract_text_impl(soup, selector)
+    
+    def _extract_text_impl(self, soup, selector=None, max_length=None):
+        """
+        从已解析的soup中提取文本内容
+        
+        指定max_length时（仅整页文本），以空格连接各文本片段，
+        累计长度超过限制后立即停止遍历，避免生成整页文本
+        """
         try:
             if selector:
                 # 尝试使用CSS选择器
-                elements = soup.select(selector)
+                elements = _compile_selector(selector).select(soup)
                 if elements:
                     return "\n\n".join([element.get_text(strip=True) for element in elements])
                 else:
                     self.logger.warning(f"没有找到匹配选择器{selector}的元素")
                     return ""
+            elif max_length is not None:
+                parts = []
+                length = 0
+                for text in soup.stripped_strings:
+                    parts.append(text)
+                    length += len(text) + 1
+                    if length > max_length:
+                        break
+                return " ".join(parts)[:max_length]
             else:
                 # 提取整个页面文本
                 return soup.get_text(strip=True)
@@ -38,24 +138,22 @@ class PageParser:
     
     def extract_links(self, html_content, base_url=None):
         """从HTML中提取所有链接"""
+        if HTMLParser is not None:
+            return self._extract_links_fast(html_content, base_url)
+        
         soup = self.parse_html(html_content)
         if not soup:
             return []
-            
+        return self._extract_links_impl(soup, base_url)
+    
+    def _extract_links_impl(self, soup, base_url=None):
+        """从已解析的soup中提取所有链接"""
         try:
-            links = []
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag['href']
-                # 处理相对路径
-                if base_url:
-                    full_url = urljoin(base_url, href)
-                else:
-                    full_url = href
-                links.append({
-                    'text': a_tag.get_text(strip=True),
-                    'url': full_url,
-                    'original_href': href
-                })
+            a_tags = soup.find_all('a', href=True)
+            hrefs = [a_tag['href'] for a_tag in a_tags]
+            texts = [_normalize_link_text(a_tag.get_text()) for a_tag in a_tags]
+            # 处理相对路径
+            links = _resolve_links(hrefs, texts, base_url)
             self.logger.info(f"提取到{len(links)}个链接")
             return links
         except Exception as e:
@@ -67,9 +165,12 @@ class PageParser:
         soup = self.parse_html(html_content)
         if not soup:
             return []
-            
+        return self._find_elements_by_selector_impl(soup, selector)
+    
+    def _find_elements_by_selector_impl(self, soup, selector):
+        """在已解析的soup中根据CSS选择器查找元素"""
         try:
-            elements = soup.select(selector)
+            elements = _compile_selector(selector).select(soup)
             result = []
             for element in elements:
                 result.append({
@@ -83,30 +184,54 @@ class PageParser:
             self.logger.error(f"查找选择器{selector}的元素失败: {str(e)}")
             return []
     
+    def elements_from_fragments(self, fragments):
+        """将浏览器端已选中节点的HTML片段转换为元素信息列表"""
+        result = []
+        try:
+            for fragment in fragments:
+                # 片段可能脱离原有上下文（如单独的<td>），使用宽松的html.parser保留原始结构
+                soup = BeautifulSoup(fragment, 'html.parser')
+                element = soup.find(True)
+                if element is None:
+                    continue
+                result.append({
+                    'text': element.get_text(strip=True),
+                    'html': fragment,
+                    'tag': element.name
+                })
+            self.logger.info(f"解析得到{len(result)}个元素片段")
+            return result
+        except Exception as e:
+            self.logger.error(f"元素片段解析失败: {str(e)}")
+            return []
+    
     def extract_metadata(self, html_content):
         """提取页面元数据，如标题、描述等"""
         soup = self.parse_html(html_content)
         if not soup:
             return {}
-            
+        return self._extract_metadata_impl(soup)
+    
+    def _extract_metadata_impl(self, soup):
+        """从已解析的soup中提取页面元数据，只遍历一次<head>（缺失时遍历整个文档）"""
         try:
             metadata = {}
             
-            # 页面标题
-            title_tag = soup.title
-            if title_tag:
-                metadata['title'] = title_tag.get_text(strip=True)
-            
-            # 元描述
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc and 'content' in meta_desc.attrs:
-                metadata['description'] = meta_desc['content']
-            
-            # 其他元标签
-            meta_tags = soup.find_all('meta')
-            for tag in meta_tags:
-                if 'name' in tag.attrs and 'content' in tag.attrs:
-                    metadata[f"meta_{tag['name'].lower()}"] = tag['content']
+            for element in (soup.head or soup).descendants:
+                if element.name == 'title':
+                    # 页面标题
+                    if 'title' not in metadata:
+                        metadata['title'] = element.get_text(strip=True)
+                elif element.name == 'meta' and 'content' in element.attrs:
+                    # 元标签，包括name和property（如Open Graph）两种形式
+                    meta_name = element.attrs.get('name') or element.attrs.get('property')
+                    if not meta_name:
+                        continue
+                    meta_name = meta_name.lower()
+                    metadata[f"meta_{meta_name}"] = element['content']
+                    # 元描述
+                    if meta_name == 'description' and 'description' not in metadata:
+                        metadata['description'] = element['content']
             
             self.logger.info("页面元数据提取完成")
             return metadata
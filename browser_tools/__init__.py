@@ -1,8 +1,9 @@
 """浏览器操作工具包，提供LLM可调用的各种浏览器操作函数"""
 
+from ._registry import get_browser, set_browser_instance
 from .navigation import go_to_url, go_back, go_forward
 from .extraction import get_page_content, find_elements_by_selector, extract_text_by_selector, extract_links, get_current_url
-from .interaction import click_element, type_text, scroll_page
+from .interaction import click_element, type_text, scroll_page, scroll_sequence
 from .screenshot import take_screenshot
 from .human_handoff import request_human_intervention
 
@@ -19,6 +20,7 @@ TOOL_FUNCTIONS = [
     click_element,
     type_text,
     scroll_page,
+    scroll_sequence,
     take_screenshot,
     request_human_intervention
 ]
@@ -0,0 +1,31 @@
+"""浏览器实例注册表，按异步上下文保存当前使用的浏览器实例及其页面解析器"""
+from contextvars import ContextVar
+from typing import Optional
+from browser_core.chrome_driver import ChromeDriver
+from browser_core.page_parser import PageParser
+
+# 每个异步任务拥有独立的上下文，多个代理可以在同一进程中并行使用各自的浏览器
+_current_browser: ContextVar[Optional[ChromeDriver]] = ContextVar("browser", default=None)
+# 解析器会保留最近一次解析的树，随浏览器实例一起按上下文隔离
+_current_parser: ContextVar[Optional[PageParser]] = ContextVar("page_parser", default=None)
+
+def set_browser_instance(driver_instance: ChromeDriver):
+    """设置当前上下文的浏览器实例并为其创建页面解析器，返回可用于恢复浏览器实例的令牌"""
+    _current_parser.set(PageParser())
+    return _current_browser.set(driver_instance)
+
+def get_browser() -> Optional[ChromeDriver]:
+    """获取当前上下文的浏览器实例，未设置时返回None"""
+    return _current_browser.get()
+
+def get_parser() -> PageParser:
+    """获取当前上下文的页面解析器，尚未创建时为当前上下文新建一个"""
+    parser = _current_parser.get()
+    if parser is None:
+        parser = PageParser()
+        _current_parser.set(parser)
+    return parser
+
+def no_browser_result(**fields) -> dict:
+    """构建浏览器实例未初始化时的工具结果，fields为各工具结果中置空的字段"""
+    return {"success": False, "message": "浏览器实例未初始化", **fields}
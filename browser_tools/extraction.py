@@ -1,18 +1,41 @@
 """页面内容提取相关工具函数"""
 import logging
-from browser_core.chrome_driver import ChromeDriver
-from browser_core.page_parser import PageParser
+from browser_tools._registry import get_browser, get_parser, no_browser_result
 
-# 全局实例
-browser = None
-parser = PageParser()
+async def _page_source_and_url(browser):
+    """
+    获取当前页面源码和URL
+    
+    页面脚本（AJAX、单页应用路由）修改DOM或URL时不会经过驱动，无法可靠判断源码是否变化，
+    因此每次都重新读取；URL从页面实时读取，不使用可能过期的URL缓存
+    
+    返回:
+        (页面源码, 当前URL) 元组
+    """
+    page_source = await browser.get_page_source()
+    current_url, _ = await browser.get_url_and_title()
+    return page_source, current_url
 
-def set_browser_instance(driver_instance: ChromeDriver):
-    """设置全局浏览器实例"""
-    global browser
-    browser = driver_instance
+async def _query_elements(browser, selector):
+    """
+    查找匹配CSS选择器的元素
+    
+    优先在浏览器端执行选择器，只传回匹配节点的HTML，避免传输整页源码；
+    CDP不可用时退回解析整页源码
+    
+    返回:
+        (元素列表, 当前URL) 元组，无法获取页面源码时元素列表为None
+    """
+    fragments = await browser.query_outer_html(selector)
+    if fragments is not None:
+        return get_parser().elements_from_fragments(fragments), await browser.get_current_url()
+    
+    page_source, current_url = await _page_source_and_url(browser)
+    if not page_source:
+        return None, current_url
+    return get_parser().find_elements_by_selector(page_source, selector), current_url
 
-def get_page_content(selector: str = None) -> dict:
+async def get_page_content(selector: str = None) -> dict:
     """
     获取当前页面的内容，可以指定CSS选择器来获取特定部分
     
@@ -22,25 +45,29 @@ def get_page_content(selector: str = None) -> dict:
     返回:
         包含操作结果的字典，包括是否成功、提取的内容和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "content": None}
+        return no_browser_result(content=None)
     
     try:
-        page_source = browser.get_page_source()
-        if not page_source:
-            return {"success": False, "message": "无法获取页面源码", "content": None}
-        
-        current_url = browser.get_current_url()
-        
         if selector:
-            content = parser.find_elements_by_selector(page_source, selector)
+            content, current_url = await _query_elements(browser, selector)
+            if content is None:
+                return {"success": False, "message": "无法获取页面源码", "content": None}
             message = f"已提取选择器 {selector} 的内容"
         else:
-            # 获取元数据和页面文本
-            metadata = parser.extract_metadata(page_source)
+            page_source, current_url = await _page_source_and_url(browser)
+            if not page_source:
+                return {"success": False, "message": "无法获取页面源码", "content": None}
+            
+            # 只解析一次页面，元数据和预览文本共用同一棵树
+            parser = get_parser()
+            soup = parser.parse_html(page_source)
+            if not soup:
+                return {"success": False, "message": "页面源码解析失败", "content": None}
             content = {
-                "metadata": metadata,
-                "text_preview": parser.extract_text(page_source)[:5000],  # 限制预览文本长度
+                "metadata": parser._extract_metadata_impl(soup),
+                "text_preview": parser._extract_text_impl(soup, max_length=5000),  # 限制预览文本长度
                 "full_length": len(page_source)
             }
             message = "已提取页面内容"
@@ -55,12 +82,12 @@ def get_page_content(selector: str = None) -> dict:
         logging.error(f"提取页面内容时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "content": None,
             "message": f"提取内容失败: {str(e)}"
         }
 
-def find_elements_by_selector(selector: str) -> dict:
+async def find_elements_by_selector(selector: str) -> dict:
     """
     根据CSS选择器查找页面元素
     
@@ -70,17 +97,15 @@ def find_elements_by_selector(selector: str) -> dict:
     返回:
         包含操作结果的字典，包括是否成功、找到的元素列表和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "elements": None}
+        return no_browser_result(elements=None)
     
     try:
-        page_source = browser.get_page_source()
-        if not page_source:
+        elements, current_url = await _query_elements(browser, selector)
+        if elements is None:
             return {"success": False, "message": "无法获取页面源码", "elements": None}
         
-        elements = parser.find_elements_by_selector(page_source, selector)
-        current_url = browser.get_current_url()
-        
         return {
             "success": True,
             "current_url": current_url,
@@ -91,12 +116,12 @@ def find_elements_by_selector(selector: str) -> dict:
         logging.error(f"查找元素 {selector} 时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "elements": None,
             "message": f"查找元素失败: {str(e)}"
         }
 
-def extract_text_by_selector(selector: str) -> dict:
+async def extract_text_by_selector(selector: str) -> dict:
     """
     根据CSS选择器提取页面文本
     
@@ -106,16 +131,18 @@ def extract_text_by_selector(selector: str) -> dict:
     返回:
         包含操作结果的字典，包括是否成功、提取的文本和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "text": None}
+        return no_browser_result(text=None)
     
     try:
-        page_source = browser.get_page_source()
-        if not page_source:
+        elements, current_url = await _query_elements(browser, selector)
+        if elements is None:
             return {"success": False, "message": "无法获取页面源码", "text": None}
         
-        text = parser.extract_text(page_source, selector)
-        current_url = browser.get_current_url()
+        if not elements:
+            logging.warning(f"没有找到匹配选择器{selector}的元素")
+        text = "\n\n".join([element["text"] for element in elements])
         
         return {
             "success": True,
@@ -127,28 +154,28 @@ def extract_text_by_selector(selector: str) -> dict:
         logging.error(f"提取选择器 {selector} 的文本时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "text": None,
             "message": f"提取文本失败: {str(e)}"
         }
 
-def extract_links() -> dict:
+async def extract_links() -> dict:
     """
     提取当前页面中的所有链接
     
     返回:
         包含操作结果的字典，包括是否成功、提取的链接列表和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "links": None}
+        return no_browser_result(links=None)
     
     try:
-        page_source = browser.get_page_source()
+        page_source, current_url = await _page_source_and_url(browser)
         if not page_source:
             return {"success": False, "message": "无法获取页面源码", "links": None}
         
-        current_url = browser.get_current_url()
-        links = parser.extract_links(page_source, current_url)
+        links = get_parser().extract_links(page_source, current_url)
         
         return {
             "success": True,
@@ -160,23 +187,24 @@ def extract_links() -> dict:
         logging.error(f"提取页面链接时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "links": None,
             "message": f"提取链接失败: {str(e)}"
         }
 
-def get_current_url() -> dict:
+async def get_current_url() -> dict:
     """
     获取当前页面的URL地址
     
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "url": None}
+        return no_browser_result(url=None)
     
     try:
-        current_url = browser.get_current_url()
+        current_url = await browser.get_current_url()
         return {
             "success": True,
             "url": current_url,
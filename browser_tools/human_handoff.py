@@ -1,19 +1,12 @@
 """人工接管相关工具函数"""
+import asyncio
 import logging
 import time
 import os
-from browser_core.chrome_driver import ChromeDriver
+from browser_tools._registry import get_browser, no_browser_result
 from browser_tools.screenshot import take_screenshot
 
-# 全局浏览器实例
-browser = None
-
-def set_browser_instance(driver_instance: ChromeDriver):
-    """设置全局浏览器实例"""
-    global browser
-    browser = driver_instance
-
-def request_human_intervention(reason: str) -> dict:
+async def request_human_intervention(reason: str) -> dict:
     """
     请求人工介入操作浏览器
     
@@ -26,15 +19,16 @@ def request_human_intervention(reason: str) -> dict:
     返回:
         包含操作结果的字典，包括是否成功、用户操作后的URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+        return no_browser_result(current_url=None)
     
     try:
-        current_url = browser.get_current_url()
+        current_url = await browser.get_current_url()
         logging.info(f"请求人工介入 - 原因: {reason}，当前URL: {current_url}")
         
         # 截取当前状态的截图
-        screenshot_result = take_screenshot(f"human_handoff_before_{reason}")
+        screenshot_result = await take_screenshot(f"human_handoff_before_{reason}", image_format="webp")
         
         # 显示人工介入提示
         print("\n" + "="*80)
@@ -52,7 +46,8 @@ def request_human_intervention(reason: str) -> dict:
         # 等待用户输入
         user_input = ""
         while user_input.lower() not in ["done", "abort"]:
-            user_input = input("请输入指令 (done/abort/help): ").strip()
+            # 在线程中读取标准输入，等待期间事件循环仍可处理其他任务
+            user_input = (await asyncio.to_thread(input, "请输入指令 (done/abort/help): ")).strip()
             
             if user_input.lower() == "help":
                 print("\n帮助信息:")
@@ -61,19 +56,22 @@ def request_human_intervention(reason: str) -> dict:
                 print("- 操作期间可以自由浏览、登录或进行任何必要的交互")
                 print("- 确保在输入 'done' 前已导航到希望自动化继续的页面\n")
         
+        # 用户可能已手动跳转或修改页面，之前缓存的页面状态不再可信
+        browser.mark_page_changed()
+        
         # 处理用户输入
         if user_input.lower() == "abort":
             print("\n任务已被用户终止。")
             return {
                 "success": False,
                 "aborted": True,
-                "current_url": browser.get_current_url(),
+                "current_url": await browser.get_current_url(),
                 "message": "任务已被用户终止"
             }
         
         # 用户完成操作，获取新状态
-        new_url = browser.get_current_url()
-        take_screenshot(f"human_handoff_after_{reason}")
+        new_url = await browser.get_current_url()
+        await take_screenshot(f"human_handoff_after_{reason}", image_format="webp")
         
         print(f"\n已恢复自动化流程，当前页面: {new_url}")
         print("="*80 + "\n")
@@ -90,6 +88,6 @@ def request_human_intervention(reason: str) -> dict:
         logging.error(f"人工介入过程中发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "message": f"人工介入失败: {str(e)}"
         }
@@ -1,17 +1,12 @@
 """页面交互相关工具函数"""
 import logging
 from selenium.webdriver.common.by import By
-from browser_core.chrome_driver import ChromeDriver
+from browser_tools._registry import get_browser, no_browser_result
 
-# 全局浏览器实例
-browser = None
+# 常见写法的选择器类型直接查表，其余写法按原规则处理（非css一律视为xpath）
+_BY_MAP = {"css": By.CSS_SELECTOR, "CSS": By.CSS_SELECTOR, "xpath": By.XPATH, "XPATH": By.XPATH}
 
-def set_browser_instance(driver_instance: ChromeDriver):
-    """设置全局浏览器实例"""
-    global browser
-    browser = driver_instance
-
-def click_element(selector: str, selector_type: str = "css") -> dict:
+async def click_element(selector: str, selector_type: str = "css") -> dict:
     """
     点击页面上的指定元素
     
@@ -22,15 +17,19 @@ def click_element(selector: str, selector_type: str = "css") -> dict:
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+        return no_browser_result(current_url=None)
     
     try:
         # 确定选择器类型
-        by = By.CSS_SELECTOR if selector_type.lower() == "css" else By.XPATH
+        by = _BY_MAP.get(selector_type) or (By.CSS_SELECTOR if selector_type.lower() == "css" else By.XPATH)
         
-        success = browser.click_element(selector, by)
-        current_url = browser.get_current_url()
+        # CSS选择器先尝试一次CDP调用完成点击，元素不存在时交由WebDriver等待重试
+        success = by == By.CSS_SELECTOR and await browser.click_element_fast(selector)
+        if not success:
+            success = await browser.click_element(selector, by)
+        current_url = await browser.get_current_url()
         
         return {
             "success": success,
@@ -41,11 +40,11 @@ def click_element(selector: str, selector_type: str = "css") -> dict:
         logging.error(f"点击元素 {selector} 时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "message": f"点击元素失败: {str(e)}"
         }
 
-def type_text(selector: str, text: str, selector_type: str = "css") -> dict:
+async def type_text(selector: str, text: str, selector_type: str = "css") -> dict:
     """
     在页面元素中输入文本
     
@@ -57,15 +56,19 @@ def type_text(selector: str, text: str, selector_type: str = "css") -> dict:
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+        return no_browser_result(current_url=None)
     
     try:
         # 确定选择器类型
-        by = By.CSS_SELECTOR if selector_type.lower() == "css" else By.XPATH
+        by = _BY_MAP.get(selector_type) or (By.CSS_SELECTOR if selector_type.lower() == "css" else By.XPATH)
         
-        success = browser.type_text(selector, text, by)
-        current_url = browser.get_current_url()
+        # CSS选择器下的普通输入框先尝试一次CDP调用完成输入，其余情况使用WebDriver逐键输入
+        success = by == By.CSS_SELECTOR and await browser.type_text_fast(selector, text)
+        if not success:
+            success = await browser.type_text(selector, text, by)
+        current_url = await browser.get_current_url()
         
         return {
             "success": success,
@@ -76,11 +79,11 @@ def type_text(selector: str, text: str, selector_type: str = "css") -> dict:
         logging.error(f"在元素 {selector} 中输入文本时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "message": f"输入文本失败: {str(e)}"
         }
 
-def scroll_page(direction: str = "down", pixels: int = None) -> dict:
+async def scroll_page(direction: str = "down", pixels: int = None) -> dict:
     """
     滚动页面
     
@@ -91,19 +94,20 @@ def scroll_page(direction: str = "down", pixels: int = None) -> dict:
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+        return no_browser_result(current_url=None)
     
     try:
         if direction.lower() not in ["down", "up"]:
             return {
                 "success": False,
-                "current_url": browser.get_current_url(),
+                "current_url": await browser.get_current_url(),
                 "message": f"无效的滚动方向: {direction}，必须是 'down' 或 'up'"
             }
         
-        success = browser.scroll(direction.lower(), pixels)
-        current_url = browser.get_current_url()
+        success = await browser.scroll(direction.lower(), pixels)
+        current_url = await browser.get_current_url()
         
         if pixels:
             message = f"已向{direction}滚动 {pixels} 像素" if success else f"无法向{direction}滚动 {pixels} 像素"
@@ -120,6 +124,45 @@ def scroll_page(direction: str = "down", pixels: int = None) -> dict:
         logging.error(f"页面滚动时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "message": f"页面滚动失败: {str(e)}"
         }
+
+async def scroll_sequence(pixels_list: list) -> dict:
+    """
+    在一次操作中依次执行多次滚动
+    
+    参数:
+        pixels_list: 每次滚动的像素数列表，正数向下滚动，负数向上滚动，例如 [500, 500, -200]
+        
+    返回:
+        包含操作结果的字典，包括是否成功、当前URL和消息
+    """
+    browser = get_browser()
+    if not browser:
+        return no_browser_result(current_url=None)
+    
+    try:
+        steps = [int(pixels) for pixels in pixels_list]
+        if not steps:
+            return {
+                "success": False,
+                "current_url": await browser.get_current_url(),
+                "message": "滚动序列不能为空"
+            }
+        
+        success = await browser.scroll_batch(steps)
+        current_url = await browser.get_current_url()
+        
+        return {
+            "success": success,
+            "current_url": current_url,
+            "message": f"已依次滚动 {len(steps)} 次，合计 {sum(steps)} 像素" if success else "批量滚动失败"
+        }
+    except Exception as e:
+        logging.error(f"批量滚动页面时发生错误: {str(e)}")
+        return {
+            "success": False,
+            "current_url": await browser.get_current_url() if browser else None,
+            "message": f"批量滚动失败: {str(e)}"
+        }
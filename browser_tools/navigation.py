@@ -1,94 +1,71 @@
 """浏览器导航相关工具函数"""
 import logging
-from browser_core.chrome_driver import ChromeDriver
+from browser_tools._registry import get_browser, no_browser_result
 
-# 全局浏览器驱动实例
-browser = None
-
-def set_browser_instance(driver_instance: ChromeDriver):
-    """设置全局浏览器实例"""
-    global browser
-    browser = driver_instance
-
-def go_to_url(url: str) -> dict:
+async def _nav(action, label: str, target: str = None) -> dict:
     """
-    导航到指定的URL地址
+    执行导航操作并返回统一格式的结果
     
     参数:
-        url: 需要导航到的网页URL
+        action: 接收浏览器实例并返回导航协程的函数
+        label: 操作名称，如 "导航"、"后退"，用于结果消息和日志
+        target: 可选的导航目标，失败时写入消息
         
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+        return no_browser_result(current_url=None)
     
     try:
-        success = browser.navigate(url)
-        current_url = browser.get_current_url()
+        # 来源URL只用于结果消息，取最近一次读取的值，不额外发起驱动调用
+        previous_url = browser.last_known_url
+        success = await action(browser)
+        current_url = await browser.get_current_url()
+        if success:
+            message = f"已从 {previous_url} {label}到 {current_url}"
+        else:
+            message = f"{label}到 {target} 失败" if target else f"{label}操作失败"
         return {
             "success": success,
             "current_url": current_url,
-            "message": f"已导航到 {url}" if success else f"导航到 {url} 失败"
+            "message": message
         }
     except Exception as e:
-        logging.error(f"导航到URL {url} 时发生错误: {str(e)}")
+        logging.error(f"{label}操作{f' {target} ' if target else ''}发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url(),
-            "message": f"导航失败: {str(e)}"
+            "current_url": await browser.get_current_url(),
+            "message": f"{label}失败: {str(e)}"
         }
 
-def go_back() -> dict:
+async def go_to_url(url: str) -> dict:
     """
-    导航到浏览器历史记录中的上一页
+    导航到指定的URL地址
     
+    参数:
+        url: 需要导航到的网页URL
+        
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
-    if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
+    return await _nav(lambda browser: browser.navigate(url), "导航", url)
+
+async def go_back() -> dict:
+    """
+    导航到浏览器历史记录中的上一页
     
-    try:
-        previous_url = browser.get_current_url()
-        success = browser.go_back()
-        current_url = browser.get_current_url()
-        return {
-            "success": success,
-            "current_url": current_url,
-            "message": f"已从 {previous_url} 后退到 {current_url}" if success else "后退操作失败"
-        }
-    except Exception as e:
-        logging.error(f"后退操作发生错误: {str(e)}")
-        return {
-            "success": False,
-            "current_url": browser.get_current_url(),
-            "message": f"后退失败: {str(e)}"
-        }
+    返回:
+        包含操作结果的字典，包括是否成功、当前URL和消息
+    """
+    return await _nav(lambda browser: browser.go_back(), "后退")
 
-def go_forward() -> dict:
+async def go_forward() -> dict:
     """
     导航到浏览器历史记录中的下一页
     
     返回:
         包含操作结果的字典，包括是否成功、当前URL和消息
     """
-    if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "current_url": None}
-    
-    try:
-        previous_url = browser.get_current_url()
-        success = browser.go_forward()
-        current_url = browser.get_current_url()
-        return {
-            "success": success,
-            "current_url": current_url,
-            "message": f"已从 {previous_url} 前进到 {current_url}" if success else "前进操作失败"
-        }
-    except Exception as e:
-        logging.error(f"前进操作发生错误: {str(e)}")
-        return {
-            "success": False,
-            "current_url": browser.get_current_url(),
-            "message": f"前进失败: {str(e)}"
-        }
+    return await _nav(lambda browser: browser.go_forward(), "前进")
@@ -1,51 +1,91 @@
 """页面截图相关工具函数"""
+import asyncio
+import itertools
 import logging
 import os
-from datetime import datetime
-from browser_core.chrome_driver import ChromeDriver
-from config.settings import Settings
+import time
+from browser_tools._registry import get_browser, no_browser_result
+from config.settings import config
 
-# 全局浏览器实例
-browser = None
-settings = Settings()
+# 截图目录由全局配置在导入时创建
+SCREENSHOT_DIR = config.screenshot_dir
 
-def set_browser_instance(driver_instance: ChromeDriver):
-    """设置全局浏览器实例"""
-    global browser
-    browser = driver_instance
+class _SafeFilenameTable(dict):
+    """供str.translate使用的转换表：保留字母数字、空格、下划线和连字符，删除其余字符，按需计算并缓存"""
+    
+    @staticmethod
+    def _map(codepoint):
+        char = chr(codepoint)
+        return codepoint if char.isalnum() or char in " _-" else None
+    
+    def __init__(self, prefill=256):
+        # 预先填充Latin-1范围，常见字符首次出现时也无需回调Python
+        super().__init__((codepoint, self._map(codepoint)) for codepoint in range(prefill))
+    
+    def __missing__(self, codepoint):
+        value = self[codepoint] = self._map(codepoint)
+        return value
+
+_SAFE_TABLE = _SafeFilenameTable()
+
+# 文件名只需在进程内唯一：进程启动时间戳加递增序号
+_SESSION_STAMP = time.strftime("%Y%m%d_%H%M%S")
+_SHOT_COUNTER = itertools.count()
+
+# 写入截图时使用的缓冲区大小
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# 支持的截图格式及对应的文件扩展名，png为无损格式，其余为体积更小的有损格式
+_IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+def _write_image(file_path: str, data: bytes):
+    """将截图字节写入文件，在线程中执行以免阻塞事件循环"""
+    with open(file_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(data)
 
-def take_screenshot(description: str = "") -> dict:
+async def take_screenshot(description: str = "", image_format: str = "jpeg") -> dict:
     """
     截取当前页面的屏幕截图并保存
     
     参数:
         description: 可选的截图描述，用于文件名
+        image_format: 图片格式，可选值为 "png"、"jpeg" 或 "webp"，默认为体积较小的 "jpeg"
         
     返回:
         包含操作结果的字典，包括是否成功、截图路径、当前URL和消息
     """
+    browser = get_browser()
     if not browser:
-        return {"success": False, "message": "浏览器实例未初始化", "screenshot_path": None, "current_url": None}
+        return no_browser_result(screenshot_path=None, current_url=None)
+    
+    extension = _IMAGE_EXTENSIONS.get(image_format)
+    if extension is None:
+        return {
+            "success": False,
+            "current_url": await browser.get_current_url(),
+            "screenshot_path": None,
+            "message": f"不支持的截图格式: {image_format}"
+        }
     
     try:
-        # 确保截图目录存在
-        screenshot_dir = os.path.join(settings.DATA_DIR, "screenshots")
-        os.makedirs(screenshot_dir, exist_ok=True)
-        
         # 生成唯一的文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stamp = f"{_SESSION_STAMP}_{next(_SHOT_COUNTER):05d}"
         if description:
             # 清理描述中的特殊字符以用于文件名
-            safe_desc = "".join([c for c in description if c.isalnum() or c in " _-"]).strip()
-            filename = f"screenshot_{timestamp}_{safe_desc}.png"
+            safe_desc = description.translate(_SAFE_TABLE).strip()
+            filename = f"screenshot_{stamp}_{safe_desc}.{extension}"
         else:
-            filename = f"screenshot_{timestamp}.png"
+            filename = f"screenshot_{stamp}.{extension}"
         
-        file_path = os.path.join(screenshot_dir, filename)
+        file_path = os.path.join(SCREENSHOT_DIR, filename)
         
-        # 截取并保存截图
-        success = browser.take_screenshot(file_path)
-        current_url = browser.get_current_url()
+        # 截取截图字节，写盘放到线程中执行
+        data = await browser.capture_screenshot(image_format)
+        success = data is not None
+        if success:
+            await asyncio.to_thread(_write_image, file_path, data)
+            logging.info(f"截图已保存至: {file_path}")
+        current_url = await browser.get_current_url()
         
         if success:
             message = f"已保存截图至 {file_path}"
@@ -64,7 +104,7 @@ def take_screenshot(description: str = "") -> dict:
         logging.error(f"截取页面截图时发生错误: {str(e)}")
         return {
             "success": False,
-            "current_url": browser.get_current_url() if browser else None,
+            "current_url": await browser.get_current_url() if browser else None,
             "screenshot_path": None,
             "message": f"截图失败: {str(e)}"
         }
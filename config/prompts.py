@@ -40,3 +40,15 @@ TOOL_CALL_FORMAT = """
 
 请确保JSON格式正确，工具名称和参数与提供的工具定义一致。
 """
+
+# 上下文压缩提示词，用于将较早的观察和工具结果合并为摘要
+CONTEXT_SUMMARY_PROMPT = """
+请将以下浏览器代理的历史记录压缩为简洁的摘要，保留：
+- 已访问的页面及其关键信息
+- 已收集到的与任务相关的数据
+- 已尝试过的操作及其结果（包括失败的操作）
+省略重复的观察和无关细节，直接输出摘要内容。
+"""
+
+# 请求最终回答时追加的提示词
+FINAL_ANSWER_PROMPT = "请根据以上信息，整理最终结果，确保格式清晰、内容完整。"
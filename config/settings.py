@@ -1,8 +1,15 @@
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
-@dataclass
+def _env_flag(name: str, default: bool = False) -> bool:
+    """读取布尔型环境变量，1/true/yes/on（不区分大小写）视为真"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+@dataclass(frozen=True, slots=True)
 class LLMConfig:
     """LLM模型配置"""
     model_name: str = os.getenv("LLM_MODEL_NAME", "gpt-4o")
@@ -11,19 +18,23 @@ class LLMConfig:
     temperature: float = 0.2
     max_tokens: int = 4096
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BrowserConfig:
     """浏览器配置"""
-    driver_path: Optional[str] = None  # 如果未指定，将使用系统默认
-    headless: bool = False  # 默认显示浏览器窗口，方便人工接管
+    driver_path: Optional[str] = os.getenv("CHROME_DRIVER_PATH")  # 如果未指定，将自动管理驱动版本
+    headless: bool = _env_flag("BROWSER_HEADLESS")  # 默认显示浏览器窗口，方便人工接管
     default_search_engine: str = "https://www.google.com/search?q="
-    user_agent: Optional[str] = None
+    user_agent: Optional[str] = os.getenv("BROWSER_USER_AGENT")  # 如果未指定，使用Chrome默认UA
+    wait_timeout: int = int(os.getenv("WEBDRIVER_WAIT_TIMEOUT", "10"))  # 等待元素和页面加载的超时秒数
+    text_only: bool = _env_flag("BROWSER_TEXT_ONLY")  # 纯文本模式，不加载图片以加快页面加载
+    # Chrome扩展文件路径，环境变量中以系统路径分隔符分隔多个路径
+    extensions: Tuple[str, ...] = tuple(path for path in os.getenv("CHROME_EXTENSIONS", "").split(os.pathsep) if path)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     """应用程序全局配置"""
-    llm: LLMConfig = LLMConfig()
-    browser: BrowserConfig = BrowserConfig()
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    browser: BrowserConfig = field(default_factory=BrowserConfig)
     data_dir: str = "data"
     output_dir: str = os.path.join("data", "outputs")
     log_dir: str = os.path.join("data", "logs")
@@ -32,6 +43,13 @@ class AppConfig:
 # 初始化配置
 config = AppConfig()
 
-# 确保数据目录存在
-for dir_path in [config.data_dir, config.output_dir, config.log_dir, config.screenshot_dir]:
-    os.makedirs(dir_path, exist_ok=True)
+# 确保数据目录存在：先创建数据根目录，子目录通常位于其下，只需各一次mkdir
+os.makedirs(config.data_dir, exist_ok=True)
+for dir_path in (config.output_dir, config.log_dir, config.screenshot_dir):
+    try:
+        os.mkdir(dir_path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        # 子目录不在数据根目录下时需要创建中间目录
+        os.makedirs(dir_path, exist_ok=True)
@@ -1,18 +1,26 @@
 import asyncio
-import json
-from typing import Any, Dict, List, Optional, Callable, Awaitable
-from pydantic import BaseModel
+import re
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Callable, Awaitable
 import aiohttp
 from config.settings import config
-from config.prompts import SYSTEM_PROMPT, TOOL_CALL_FORMAT
+from utils.json_utils import JSONDecodeError, dumps_bytes, loads
+from config.prompts import SYSTEM_PROMPT, TOOL_CALL_FORMAT, CONTEXT_SUMMARY_PROMPT, FINAL_ANSWER_PROMPT
 
-class ToolDefinition(BaseModel):
+TOOL_CALL_START = "<tool_call>"
+TOOL_CALL_END = "</tool_call>"
+_TOOL_RE = re.compile(r"<tool_call>(.*?)</tool_call>", re.DOTALL)
+
+@dataclass(slots=True)
+class ToolDefinition:
     """工具定义模型，用于描述可供LLM调用的工具"""
     name: str
     description: str
     parameters: Dict[str, Any]
 
-class LLMResponse(BaseModel):
+@dataclass(slots=True)
+class LLMResponse:
     """LLM响应模型"""
     content: Optional[str] = None
     tool_call: Optional[Dict[str, Any]] = None
@@ -27,50 +35,148 @@ class LLMClient:
         self.model_name = config.llm.model_name
         self.temperature = config.llm.temperature
         self.max_tokens = config.llm.max_tokens
-        self.session = aiohttp.ClientSession()
+        # 复用同一个会话和保活连接，后续请求省去TCP和TLS握手；DNS结果同样缓存
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=8,
+            keepalive_timeout=90,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            # 流式生成可能持续较久，不限制总时长，只限制建立连接和单次读取的超时
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=60)
+        )
+        # 请求头在会话期间不变，只构建一次
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
         self.tools: List[ToolDefinition] = []
+        # 工具列表注册后不再变化，工具说明和完整系统提示词在注册时一次性构建
+        self._tools_prompt = self._format_tools_for_prompt()
+        self._system_message_with_tools = SYSTEM_PROMPT
+        # 消息列表中固定不变的部分同样只构建一次；任务消息在任务变化时才重建
+        self._system_msg = {"role": "system", "content": SYSTEM_PROMPT}
+        self._final_system_msg = {"role": "system", "content": SYSTEM_PROMPT}
+        self._final_prompt_msg = {"role": "user", "content": FINAL_ANSWER_PROMPT}
+        self._user_task = None
+        self._user_task_msg = None
         
     async def close(self):
         """关闭HTTP会话"""
         await self.session.close()
     
     def register_tools(self, tools: List[ToolDefinition]):
-        """注册可供LLM调用的工具"""
+        """注册可供LLM调用的工具，并预先构建包含工具说明的系统提示词"""
         self.tools = tools
+        self._tools_prompt = self._format_tools_for_prompt()
+        if tools:
+            self._system_message_with_tools = "\n\n".join((SYSTEM_PROMPT, self._tools_prompt, TOOL_CALL_FORMAT))
+        else:
+            self._system_message_with_tools = SYSTEM_PROMPT
+        self._system_msg = {"role": "system", "content": self._system_message_with_tools}
     
     def _format_tools_for_prompt(self) -> str:
         """将工具定义格式化为适合提示词的字符串"""
         if not self.tools:
             return "没有可用工具"
-            
-        tools_str = "可用工具列表：\n"
+        
+        lines = ["可用工具列表："]
         for tool in self.tools:
-            tools_str += f"- {tool.name}: {tool.description}\n"
-            tools_str += "  参数：\n"
-            for param_name, param_info in tool.parameters.items():
-                tools_str += f"    {param_name}: {param_info}\n"
-        return tools_str
+            lines.append(f"- {tool.name}: {tool.description}")
+            lines.append("  参数：")
+            lines.extend(f"    {param_name}: {param_info}" for param_name, param_info in tool.parameters.items())
+        return "\n".join(lines) + "\n"
     
-    async def _call_openai_api(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        """调用OpenAI兼容的API"""
+    def _build_request(self, messages: List[Dict[str, str]], stream: bool):
+        """构建OpenAI兼容API的请求地址、请求头和请求体"""
         url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
         payload = {
             "model": self.model_name,
             "messages": messages,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
-            "stream": False
+            "stream": stream
         }
+        if stream:
+            # 让服务端在工具调用块结束时停止生成，节省输出token
+            payload["stop"] = [TOOL_CALL_END]
+        return url, self._headers, payload
+    
+    async def _call_openai_api(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """调用OpenAI兼容的API"""
+        url, headers, payload = self._build_request(messages, stream=False)
         
-        async with self.session.post(url, headers=headers, json=payload) as response:
+        async with self.session.post(url, headers=headers, data=dumps_bytes(payload)) as response:
             if response.status != 200:
                 raise Exception(f"LLM API调用失败: {await response.text()}")
-            return await response.json()
+            return loads(await response.read())
+    
+    async def _stream_openai_api(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """以流式方式调用OpenAI兼容的API，逐个产出增量文本"""
+        url, headers, payload = self._build_request(messages, stream=True)
+        
+        async with self.session.post(url, headers=headers, data=dumps_bytes(payload)) as response:
+            if response.status != 200:
+                raise Exception(f"LLM API调用失败: {await response.text()}")
+            
+            # 解析SSE数据帧：每帧为一行 "data: {...}"，以 "data: [DONE]" 结束；直接解析字节，省去解码
+            async for raw_line in response.content:
+                line = raw_line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    break
+                
+                choices = loads(data).get("choices")
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+    
+    async def _collect_stream(self, messages: List[Dict[str, str]]) -> str:
+        """
+        收集流式响应的文本，一旦工具调用块完整即停止读取
+        
+        提前退出时关闭响应，服务端随即停止生成，工具可以更早开始执行
+        """
+        content = ""
+        async with aclosing(self._stream_openai_api(messages)) as stream:
+            async for delta in stream:
+                # 结束标签可能跨越数据帧，只需检查新增部分及其前面的少量字符
+                search_from = max(0, len(content) - len(TOOL_CALL_END))
+                content += delta
+                if TOOL_CALL_END in content[search_from:] and TOOL_CALL_START in content:
+                    break
+        # 服务端按stop截断时不会返回结束标签本身，补全后交给工具调用解析
+        start = content.rfind(TOOL_CALL_START)
+        if start != -1 and TOOL_CALL_END not in content[start:]:
+            content += TOOL_CALL_END
+        return content
+    
+    async def summarize_context(self, messages: List[Dict[str, str]]) -> str:
+        """
+        将较早的对话上下文压缩为简短摘要
+        
+        参数:
+            messages: 需要压缩的上下文消息（可能包含上一次的摘要）
+        
+        返回:
+            摘要文本，调用失败时返回简单的截断拼接
+        """
+        history = "\n".join(f"[{message['role']}] {message['content']}" for message in messages)
+        try:
+            response = await self._call_openai_api([
+                {"role": "system", "content": CONTEXT_SUMMARY_PROMPT},
+                {"role": "user", "content": history}
+            ])
+            return response["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            return f"（摘要生成失败: {str(e)}）{history[-1000:]}"
     
     async def generate_response(
         self, 
@@ -89,48 +195,31 @@ class LLMClient:
         返回:
             LLMResponse对象，包含响应内容和可能的工具调用
         """
-        # 构建系统提示词
-        system_message = SYSTEM_PROMPT
-        
-        # 如果有工具，添加工具信息
-        if self.tools and not is_final:
-            system_message += "\n\n" + self._format_tools_for_prompt()
-            system_message += "\n\n" + TOOL_CALL_FORMAT
+        if user_task != self._user_task:
+            self._user_task = user_task
+            self._user_task_msg = {"role": "user", "content": f"任务：{user_task}"}
         
-        # 构建消息列表
-        messages = [{"role": "system", "content": system_message}]
-        # 添加用户任务
-        messages.append({"role": "user", "content": f"任务：{user_task}"})
-        # 添加上下文
-        messages.extend(context)
-        
-        # 如果是请求最终回答，提示LLM整理结果
+        # 构建消息列表：系统提示词（有工具时使用注册时预先构建的版本）、用户任务、上下文
         if is_final:
-            messages.append({
-                "role": "user", 
-                "content": "请根据以上信息，整理最终结果，确保格式清晰、内容完整。"
-            })
+            # 请求最终回答时不提供工具，并提示LLM整理结果
+            messages = [self._final_system_msg, self._user_task_msg, *context, self._final_prompt_msg]
+        else:
+            messages = [self._system_msg, self._user_task_msg, *context]
         
         # 调用LLM API
         try:
-            response = await self._call_openai_api(messages)
-            content = response["choices"][0]["message"]["content"]
+            content = await self._collect_stream(messages)
             
             # 检查是否包含工具调用
             tool_call = None
-            if "<tool_call>" in content and "</tool_call>" in content:
-                start = content.find("<tool_call>") + len("<tool_call>")
-                end = content.find("</tool_call>")
-                tool_call_str = content[start:end].strip()
-                
+            match = _TOOL_RE.search(content)
+            if match:
                 try:
-                    tool_call = json.loads(tool_call_str)
+                    tool_call = loads(match.group(1).strip())
                     # 提取纯文本内容（不包含工具调用部分）
-                    content = content[:start - len("<tool_call>")] + content[end + len("</tool_call>"):]
-                    content = content.strip()
-                except json.JSONDecodeError:
+                    content = (content[:match.start()] + content[match.end():]).strip()
+                except JSONDecodeError:
                     # 如果解析失败，将整个内容视为普通文本
-                    content = content
                     tool_call = None
             
             # 判断是否完成任务
@@ -0,0 +1,83 @@
+"""页面文本artifact存储与读取测试"""
+import asyncio
+
+import pytest
+
+from agent.main_agent import MAX_TOOL_RESULT_LENGTH, PAGE_TEXT_EXCERPT_LENGTH, ToolExecutor
+from utils.json_utils import dumps
+
+def page_result(text):
+    return {"success": True, "content": {"text_preview": text}}
+
+def test_long_text_is_stored_and_replaced_by_excerpt():
+    executor = ToolExecutor(None)
+    text = "a" * (PAGE_TEXT_EXCERPT_LENGTH + 500)
+    result = page_result(text)
+    executor._store_page_text(result)
+    
+    preview = result["content"]["text_preview"]
+    digest = next(iter(executor.artifacts))
+    assert executor.artifacts[digest] == text
+    assert preview == f"[artifact:{digest}, {len(text)} chars] " + "a" * PAGE_TEXT_EXCERPT_LENGTH + "..."
+
+def test_repeated_text_keeps_excerpt_and_reference():
+    executor = ToolExecutor(None)
+    executor._store_page_text(page_result("重复的页面文本"))
+    result = page_result("重复的页面文本")
+    executor._store_page_text(result)
+    
+    preview = result["content"]["text_preview"]
+    assert len(executor.artifacts) == 1
+    assert preview.startswith("[artifact:")
+    assert "与之前获取的页面文本相同" in preview
+    assert preview.endswith("重复的页面文本")
+
+def test_results_without_preview_are_untouched():
+    executor = ToolExecutor(None)
+    result = {"success": False, "content": None}
+    executor._store_page_text(result)
+    assert result == {"success": False, "content": None}
+    assert executor.artifacts == {}
+
+# 第二组元数据本身就超过结果长度上限，引用只能在截断后补回
+@pytest.mark.parametrize("repeat", [20, 40])
+def test_reference_survives_large_metadata(repeat):
+    executor = ToolExecutor(None)
+    text = "页面正文" * 1000
+    metadata = {f"meta_og:field{i}": "很长的元数据内容" * repeat for i in range(9)}
+    
+    async def fake_get_page_content(selector: str = None):
+        return {"success": True, "content": {"metadata": metadata, "text_preview": text}}
+    executor._funcs["get_page_content"] = fake_get_page_content
+    
+    response = asyncio.run(executor.execute("get_page_content", {}))
+    digest = next(iter(executor.artifacts))
+    assert f"[artifact:{digest}, {len(text)} chars]" in response
+
+def test_excerpt_is_sized_to_fit_result_limit():
+    executor = ToolExecutor(None)
+    text = "第一行\n" * 1000
+    result = {"success": True, "content": {"metadata": {"title": "标题" * 200}, "text_preview": text}}
+    executor._store_page_text(result)
+    assert len(dumps(result)) <= MAX_TOOL_RESULT_LENGTH
+    assert result["content"]["text_preview"].endswith("...")
+
+def test_read_artifact_returns_requested_slice():
+    executor = ToolExecutor(None)
+    text = "0123456789" * 300
+    result = page_result(text)
+    executor._store_page_text(result)
+    digest = next(iter(executor.artifacts))
+    reference = f"[artifact:{digest}, {len(text)} chars]"
+    assert reference in result["content"]["text_preview"]
+    
+    response = asyncio.run(executor.read_artifact(reference, offset=2995, length=100))
+    assert response["success"]
+    assert response["text"] == text[2995:]
+    assert response["total_length"] == len(text)
+
+def test_read_artifact_is_registered_as_tool():
+    executor = ToolExecutor(None)
+    assert "read_artifact" in {tool.name for tool in executor.get_tool_definitions()}
+    response = asyncio.run(executor.execute("read_artifact", {"ref": "deadbeef"}))
+    assert '"success":false' in response
@@ -0,0 +1,28 @@
+"""点击后跳转等待测试"""
+from browser_core.chrome_driver import ChromeDriver
+
+class FakeDriver:
+    """按顺序返回预设的脚本结果，并记录执行过的脚本"""
+    def __init__(self, results):
+        self.results = list(results)
+        self.scripts = []
+    
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return self.results.pop(0)
+
+def make_driver(results):
+    driver = ChromeDriver()
+    driver.driver = FakeDriver(results)
+    return driver
+
+def test_click_without_navigation_does_not_wait():
+    driver = make_driver([])
+    driver._wait_after_click(100.0, navigating=False)
+    assert driver.driver.scripts == []
+
+def test_click_with_navigation_waits_for_new_document():
+    # 两次仍是旧文档，第三次时间原点变化，随后就绪检查返回complete
+    driver = make_driver([100.0, 100.0, 200.0, ["complete", "https://example.com/next"]])
+    driver._wait_after_click(100.0, navigating=True)
+    assert driver.driver.results == []
@@ -0,0 +1,65 @@
+"""对话上下文缓冲区测试"""
+from agent.main_agent import ContextBuffer
+
+def observation(text):
+    return {"role": "system", "content": f"{ContextBuffer.OBSERVATION_PREFIX}{text}"}
+
+def message(text):
+    return {"role": "assistant", "content": text}
+
+def test_repeated_observation_is_skipped():
+    buffer = ContextBuffer()
+    buffer.append(observation("页面A"))
+    buffer.append(observation("页面A"))
+    assert len(buffer) == 1
+
+def test_only_recent_observations_are_kept():
+    buffer = ContextBuffer(max_observations=2)
+    for name in ("A", "B", "C"):
+        buffer.append(observation(name))
+        buffer.append(message(f"思考{name}"))
+    contents = [item["content"] for item in buffer]
+    assert observation("A")["content"] not in contents
+    assert contents.count(observation("B")["content"]) == 1
+    assert contents.count(observation("C")["content"]) == 1
+    assert len(contents) == 5
+
+def test_overflow_is_empty_within_limit():
+    buffer = ContextBuffer(max_messages=3)
+    for index in range(3):
+        buffer.append(message(str(index)))
+    assert buffer.overflow() == []
+
+def test_overflow_and_compact_replace_older_messages_with_summary():
+    buffer = ContextBuffer(max_messages=2)
+    for index in range(4):
+        buffer.append(message(str(index)))
+    older = buffer.overflow()
+    assert [item["content"] for item in older] == ["0", "1"]
+    
+    buffer.compact("摘要", older)
+    items = list(buffer)
+    assert items[0]["content"].endswith("摘要")
+    assert [item["content"] for item in items[1:]] == ["2", "3"]
+    assert len(buffer) == 3
+
+def test_overflow_includes_previous_summary():
+    buffer = ContextBuffer(max_messages=1)
+    buffer.append(message("0"))
+    buffer.append(message("1"))
+    buffer.compact("旧摘要", buffer.overflow())
+    buffer.append(message("2"))
+    older = buffer.overflow()
+    assert older[0]["content"].endswith("旧摘要")
+    assert [item["content"] for item in older[1:]] == ["1"]
+
+def test_compact_keeps_messages_appended_while_summarizing():
+    buffer = ContextBuffer(max_messages=2)
+    for index in range(4):
+        buffer.append(message(str(index)))
+    older = buffer.overflow()
+    # 摘要在后台生成期间加入的新消息不能被移除
+    for index in range(4, 7):
+        buffer.append(message(str(index)))
+    buffer.compact("摘要", older)
+    assert [item["content"] for item in buffer][1:] == ["2", "3", "4", "5", "6"]
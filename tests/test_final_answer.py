@@ -0,0 +1,20 @@
+"""最终回答判断测试"""
+from agent.main_agent import FINAL_ANSWER_MIN_LENGTH, _looks_final
+
+def test_long_answer_with_marker_is_final():
+    content = "综上所述，" + "该网站的价格信息如下。" * 10
+    assert len(content) > FINAL_ANSWER_MIN_LENGTH
+    assert _looks_final(content)
+
+def test_marker_is_case_insensitive():
+    assert _looks_final("FINAL ANSWER: " + "x" * FINAL_ANSWER_MIN_LENGTH)
+
+def test_short_answer_is_not_final():
+    assert not _looks_final("总结：完成")
+
+def test_long_answer_without_marker_is_not_final():
+    assert not _looks_final("任务已完成" + "。" * FINAL_ANSWER_MIN_LENGTH)
+
+def test_empty_answer_is_not_final():
+    assert not _looks_final(None)
+    assert not _looks_final("")
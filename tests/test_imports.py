@@ -0,0 +1,27 @@
+"""导入冒烟测试：确保各模块及其配置依赖可以正常导入"""
+import importlib
+
+import pytest
+
+MODULES = [
+    "config.settings",
+    "config.prompts",
+    "utils.json_utils",
+    "utils.logger",
+    "llm.client",
+    "browser_core.chrome_driver",
+    "browser_core.page_parser",
+    "browser_tools",
+    "agent.main_agent",
+    "main",
+]
+
+@pytest.mark.parametrize("module_name", MODULES)
+def test_module_imports(module_name):
+    importlib.import_module(module_name)
+
+def test_browser_config_covers_driver_settings():
+    from config.settings import config
+
+    for name in ("driver_path", "headless", "user_agent", "wait_timeout", "extensions", "text_only"):
+        assert hasattr(config.browser, name)
@@ -0,0 +1,27 @@
+"""JSON序列化工具测试"""
+import pytest
+
+from utils.json_utils import JSONDecodeError, dumps, dumps_bytes, loads
+
+def test_non_ascii_is_written_as_utf8():
+    assert dumps({"message": "已导航到页面"}) == '{"message":"已导航到页面"}'
+
+def test_unserializable_values_fall_back_to_str():
+    class Marker:
+        def __str__(self):
+            return "marker"
+    assert dumps({"value": Marker()}) == '{"value":"marker"}'
+
+def test_non_string_keys_are_allowed():
+    assert dumps({1: "a"}) == '{"1":"a"}'
+
+def test_bytes_and_str_round_trip():
+    data = {"success": True, "links": [{"text": "首页", "url": "https://example.com"}]}
+    assert dumps_bytes(data) == dumps(data).encode("utf-8")
+    assert loads(dumps_bytes(data)) == data
+    assert loads(dumps(data)) == data
+
+def test_invalid_json_raises_decode_error():
+    with pytest.raises(JSONDecodeError):
+        loads("{not json}")
+    assert issubclass(JSONDecodeError, ValueError)
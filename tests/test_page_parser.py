@@ -0,0 +1,33 @@
+"""页面解析器测试"""
+from browser_core import page_parser
+from browser_core.page_parser import PageParser
+
+HTML = """
+<html><head><title>标题</title><script>var a = 1;</script></head>
+<body>
+<a href="/docs">文档</a>
+<a href="https://example.org/x">外部</a>
+</body></html>
+"""
+
+def test_fast_backend_is_available():
+    # requirements中的selectolax必须可用，否则链接提取会静默退回较慢的后端
+    assert page_parser.HTMLParser is not None
+    assert PageParser()._parse_fast(HTML) is not None
+
+def test_extract_links_resolves_relative_hrefs():
+    links = PageParser().extract_links(HTML, "https://example.com/a/")
+    assert links == [
+        {"text": "文档", "url": "https://example.com/docs", "original_href": "/docs"},
+        {"text": "外部", "url": "https://example.org/x", "original_href": "https://example.org/x"},
+    ]
+
+def test_extract_text_with_selector():
+    assert PageParser().extract_text(HTML, "a") == "文档\n\n外部"
+
+def test_link_text_matches_between_backends():
+    html = '<a href="/a">Foo <b>Bar</b></a><a href="/b">多行\n  文本</a><a href="/c">Foo<b>Bar</b></a>'
+    parser = PageParser()
+    fast = [link["text"] for link in parser._extract_links_fast(html)]
+    fallback = [link["text"] for link in parser._extract_links_impl(parser.parse_html(html))]
+    assert fast == fallback == ["Foo Bar", "多行 文本", "FooBar"]
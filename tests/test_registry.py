@@ -0,0 +1,17 @@
+"""浏览器实例注册表测试"""
+import asyncio
+
+from browser_tools._registry import get_browser, get_parser, set_browser_instance
+
+def test_parallel_agents_get_separate_browser_and_parser():
+    async def agent(browser):
+        set_browser_instance(browser)
+        await asyncio.sleep(0)
+        return get_browser(), get_parser()
+    
+    async def main():
+        return await asyncio.gather(agent("a"), agent("b"))
+    
+    (browser_a, parser_a), (browser_b, parser_b) = asyncio.run(main())
+    assert (browser_a, browser_b) == ("a", "b")
+    assert parser_a is not parser_b
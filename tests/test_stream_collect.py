@@ -0,0 +1,47 @@
+"""流式响应收集与stop序列处理测试"""
+import asyncio
+
+from llm.client import TOOL_CALL_END, LLMClient
+
+def collect(deltas):
+    """以给定的增量文本序列模拟流式响应，返回收集结果和实际读取的增量数"""
+    consumed = []
+    
+    async def main():
+        client = LLMClient()
+        async def stream(messages):
+            for delta in deltas:
+                consumed.append(delta)
+                yield delta
+        client._stream_openai_api = stream
+        try:
+            return await client._collect_stream([])
+        finally:
+            await client.close()
+    return asyncio.run(main()), len(consumed)
+
+def test_stops_reading_once_tool_call_is_complete():
+    deltas = ["思考<tool", "_call>{\"name\": \"back\"}</tool", "_call>", "多余的内容", "更多内容"]
+    content, consumed = collect(deltas)
+    assert content == "思考<tool_call>{\"name\": \"back\"}</tool_call>"
+    assert consumed == 3
+
+def test_closing_tag_is_restored_when_cut_by_stop_sequence():
+    content, _ = collect(["<tool_call>", "{\"name\": \"back\"}"])
+    assert content == "<tool_call>{\"name\": \"back\"}" + TOOL_CALL_END
+
+def test_plain_answer_is_unchanged():
+    content, consumed = collect(["最终", "答案"])
+    assert content == "最终答案"
+    assert consumed == 2
+
+def test_streaming_request_sends_stop_sequence():
+    async def main():
+        client = LLMClient()
+        try:
+            return client._build_request([], stream=True), client._build_request([], stream=False)
+        finally:
+            await client.close()
+    (_, _, stream_payload), (_, _, plain_payload) = asyncio.run(main())
+    assert stream_payload["stop"] == [TOOL_CALL_END]
+    assert "stop" not in plain_payload
@@ -0,0 +1,39 @@
+"""LLM响应中工具调用块的解析测试"""
+import asyncio
+
+from llm.client import LLMClient
+
+def generate(content, **kwargs):
+    """以固定的模型输出调用generate_response"""
+    async def main():
+        client = LLMClient()
+        async def collect_stream(messages):
+            return content
+        client._collect_stream = collect_stream
+        try:
+            return await client.generate_response("任务", [], **kwargs)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_tool_call_is_parsed_and_stripped():
+    response = generate('先打开页面。\n<tool_call>\n{"name": "go_to_url", "parameters": {"url": "https://example.com"}}\n</tool_call>\n')
+    assert response.tool_call == {"name": "go_to_url", "parameters": {"url": "https://example.com"}}
+    assert response.content == "先打开页面。"
+    assert not response.is_finished
+
+def test_only_first_tool_call_is_used():
+    response = generate('<tool_call>{"name": "back"}</tool_call>中间<tool_call>{"name": "forward"}</tool_call>')
+    assert response.tool_call == {"name": "back"}
+    assert response.content == '中间<tool_call>{"name": "forward"}</tool_call>'
+
+def test_invalid_tool_call_json_is_kept_as_text():
+    content = "<tool_call>{not json}</tool_call>"
+    response = generate(content)
+    assert response.tool_call is None
+    assert response.content == content
+
+def test_finished_answer_without_tool_call():
+    response = generate("任务已完成，结果如下。")
+    assert response.tool_call is None
+    assert response.is_finished
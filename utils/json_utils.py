@@ -0,0 +1,17 @@
+"""JSON序列化工具，基于orjson实现，非ASCII字符（如中文）直接以UTF-8输出"""
+import orjson
+
+# 解析失败时抛出的异常，是ValueError的子类
+JSONDecodeError = orjson.JSONDecodeError
+
+def dumps_bytes(obj) -> bytes:
+    """将对象序列化为UTF-8编码的JSON字节，适合直接作为HTTP请求体"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+def dumps(obj) -> str:
+    """将对象序列化为JSON字符串，无法序列化的对象转为字符串"""
+    return dumps_bytes(obj).decode("utf-8")
+
+def loads(data):
+    """将JSON字符串或字节解析为Python对象"""
+    return orjson.loads(data)
@@ -0,0 +1,51 @@
+"""日志配置工具，日志的实际输出在后台线程中完成，不阻塞事件循环"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from config.settings import config
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# 后台日志监听器，setup_logger调用后才会创建
+_listener = None
+
+def setup_logger(level: str = "INFO"):
+    """
+    配置根日志记录器
+
+    根记录器只挂载QueueHandler，记录日志时仅将记录放入队列；
+    QueueListener在后台线程中将记录写入控制台和日志文件
+
+    参数:
+        level: 日志级别，如 "DEBUG"、"INFO"、"WARNING"、"ERROR"
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler(os.path.join(config.log_dir, "webagent.log"), encoding="utf-8")
+    file_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener():
+    """进程退出前输出队列中剩余的日志"""
+    if _listener is not None:
+        _listener.stop()
+
+atexit.register(_stop_listener)
+
+def get_logger(name: str) -> logging.Logger:
+    """获取指定名称的日志记录器，输出由根记录器统一处理"""
+    return logging.getLogger(name)